@@ -0,0 +1,58 @@
+import datetime
+import random
+
+# Synthetic ground truth corpora. Everything is derived from the seed, so two runs
+# with the same seed and sizes benchmark exactly the same data.
+
+WORDS = [
+    "revenue", "policy", "quarter", "employee", "benefit", "contract", "region", "forecast",
+    "invoice", "supplier", "compliance", "training", "budget", "customer", "renewal", "audit",
+    "pipeline", "margin", "headcount", "security", "onboarding", "travel", "expense", "approval",
+    "vendor", "incident", "release", "roadmap", "target", "report", "summary", "deadline"
+]
+EXTENSIONS = ["pdf", "docx", "xlsx", "pptx", "txt"]
+AGENT_COUNT = 20
+TAG_COUNT = 200
+SUBMITTER_COUNT = 50
+
+def _sentence(rng, length):
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize()
+
+def make_file_names(count, seed=0):
+    """Return count distinct file names, with some repeated stems like real uploads."""
+    rng = random.Random(seed)
+    names = []
+    for position in range(count):
+        stem = f"{rng.choice(WORDS)}-{rng.choice(WORDS)}-{position:06d}"
+        names.append(f"{stem}.{rng.choice(EXTENSIONS)}")
+    return names
+
+def make_questions(count, file_names, seed=0):
+    """Return count questions in the stored format, referencing the given files."""
+    rng = random.Random(seed)
+    agents = [f"Agent {position:02d}" for position in range(AGENT_COUNT)]
+    tags = [f"{rng.choice(WORDS)}-{position:03d}" for position in range(TAG_COUNT)]
+    submitters = [f"user{position:02d}@example.com" for position in range(SUBMITTER_COUNT)]
+    start = datetime.date(2023, 1, 1)
+
+    questions = []
+    for position in range(count):
+        documents = []
+        for file_name in rng.sample(file_names, min(len(file_names), rng.randint(0, 3))):
+            pages = ",".join(str(page) for page in sorted(rng.sample(range(1, 60), rng.randint(1, 3))))
+            documents.append({"name": file_name, "pages": pages, "source": rng.choice(["S3", "SharePoint", "S3, SharePoint"])})
+        questions.append({
+            "Question": _sentence(rng, rng.randint(8, 20)) + "?",
+            "Ideal Answer": _sentence(rng, rng.randint(20, 80)) + ".",
+            "Reference Documents": documents,
+            "Agent Name": rng.choice(agents),
+            "Tags": rng.sample(tags, rng.randint(0, 4)),
+            "Created On": (start + datetime.timedelta(days=rng.randint(0, 700))).isoformat(),
+            "Submitted By": rng.choice(submitters),
+            "id": f"bench-{position:07d}"
+        })
+    return questions
+
+def make_file_bytes(size, seed=0):
+    """Return size bytes of reproducible file content."""
+    return random.Random(seed).randbytes(size)
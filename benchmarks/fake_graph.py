@@ -0,0 +1,193 @@
+import datetime
+import json
+import threading
+import time
+import urllib.parse
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# In-memory stand-in for the parts of Microsoft Graph the app uses: site and drive
+# lookup, the Eval Benchmark folder, root delta queries, item lookup, simple and
+# resumable uploads and $batch. Responses follow Graph's shapes closely enough for
+# utils/sharepoint.py and utils/catalog.py to run unchanged against it.
+
+SITE_ID = "bench-site"
+DRIVE_ID = "bench-drive"
+FOLDER_ID = "bench-folder"
+DELTA_PAGE_SIZE = 200  # items per delta page, as returned by SharePoint
+
+class FakeGraph:
+    """Drive state shared by the request handlers."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.items = []  # driveItems in creation order; the position is the delta sequence
+        self.by_name = {}
+        self.sessions = {}  # upload session ID -> {"name", "size", "received"}
+        self.lock = threading.Lock()
+
+    def add_file(self, name, size):
+        """Create or replace a file in the Eval Benchmark folder and return its driveItem."""
+        with self.lock:
+            item = {
+                "id": f"item-{len(self.items):07d}",
+                "name": name,
+                "size": size,
+                "file": {},
+                "lastModifiedDateTime": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "createdBy": {"user": {"displayName": "Benchmark"}},
+                "parentReference": {"id": FOLDER_ID, "driveId": DRIVE_ID}
+            }
+            previous = self.by_name.get(name)
+            if previous is not None:
+                item["id"] = previous["id"]
+            self.items.append(item)
+            self.by_name[name] = item
+            return item
+
+    def delta(self, base_url, token, skip):
+        """Return one delta page of the changes after sequence number token."""
+        with self.lock:
+            end = len(self.items)
+            page = self.items[token + skip:token + skip + DELTA_PAGE_SIZE]
+        body = {"value": page}
+        if token + skip + len(page) < end:
+            body["@odata.nextLink"] = f"{base_url}/drives/{DRIVE_ID}/root/delta?token={token}&skip={skip + len(page)}"
+        else:
+            body["@odata.deltaLink"] = f"{base_url}/drives/{DRIVE_ID}/root/delta?token={end}"
+        return body
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def graph(self):
+        return self.server.graph
+
+    @property
+    def base_url(self):
+        return f"http://{self.server.server_address[0]}:{self.server.server_address[1]}/v1.0"
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _route(self, method, path, query, body):
+        """Return (status, JSON body) for a Graph request path relative to /v1.0."""
+        graph = self.graph
+        drive = f"/drives/{DRIVE_ID}"
+        folder = f"{drive}/items/{FOLDER_ID}:/"
+
+        if method == "GET" and path.startswith("/sites/") and ":/sites/" in path:
+            return 200, {"id": SITE_ID}
+        if method == "GET" and path == f"/sites/{SITE_ID}/drives":
+            return 200, {"value": [{"id": DRIVE_ID, "name": "Documents"}]}
+        if method == "GET" and path == f"{drive}/root:/Eval Benchmark":
+            return 200, {"id": FOLDER_ID, "name": "Eval Benchmark", "folder": {}}
+        if method == "GET" and path == f"{drive}/root/children":
+            return 200, {"value": [{"id": FOLDER_ID, "name": "Eval Benchmark", "folder": {}}]}
+        if method == "GET" and path == f"{drive}/root/delta":
+            token = int(query.get("token", ["0"])[0])
+            skip = int(query.get("skip", ["0"])[0])
+            return 200, graph.delta(self.base_url, token, skip)
+
+        if path.startswith(folder):
+            name = path[len(folder):]
+            if method == "PUT" and name.endswith(":/content"):
+                return 201, graph.add_file(name[:-len(":/content")], len(body))
+            if method == "POST" and name.endswith(":/createUploadSession"):
+                with graph.lock:
+                    session_id = f"session-{len(graph.sessions)}"
+                    graph.sessions[session_id] = {"name": name[:-len(":/createUploadSession")], "received": 0}
+                return 200, {"uploadUrl": f"{self.base_url}/upload/{session_id}"}
+            if method == "GET":
+                item = graph.by_name.get(name)
+                return (200, item) if item else (404, {"error": {"code": "itemNotFound"}})
+
+        if path.startswith("/upload/"):
+            session = graph.sessions.get(path[len("/upload/"):])
+            if session is None:
+                return 404, {"error": {"code": "itemNotFound"}}
+            if method == "DELETE":
+                graph.sessions.pop(path[len("/upload/"):], None)
+                return 204, None
+            if method == "PUT":
+                content_range = self.headers.get("Content-Range", "")
+                total = int(content_range.rsplit("/", 1)[-1])
+                session["received"] += len(body)
+                if session["received"] >= total:
+                    return 201, graph.add_file(session["name"], total)
+            return 202 if method == "PUT" else 200, {"nextExpectedRanges": [f"{session['received']}-"]}
+
+        if method == "POST" and path == "/$batch":
+            responses = []
+            for request in json.loads(body or b"{}").get("requests", []):
+                parsed = urllib.parse.urlsplit(request["url"])
+                status, sub_body = self._route(
+                    request.get("method", "GET"), urllib.parse.unquote(parsed.path),
+                    urllib.parse.parse_qs(parsed.query), b""
+                )
+                responses.append({"id": request["id"], "status": status, "headers": {}, "body": sub_body})
+            return 200, {"responses": responses}
+
+        return 404, {"error": {"code": "notFound", "message": f"{method} {path}"}}
+
+    def _handle(self, method):
+        if self.graph.latency:
+            time.sleep(self.graph.latency)
+        parsed = urllib.parse.urlsplit(self.path)
+        path = urllib.parse.unquote(parsed.path)
+        body = self._body()
+        if not path.startswith("/v1.0/"):
+            self._send(404, {"error": {"code": "notFound"}})
+            return
+        status, response = self._route(method, path[len("/v1.0"):], urllib.parse.parse_qs(parsed.query), body)
+        self._send(status, response)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+class FakeGraphServer:
+    """Serve a FakeGraph on a local port in a background thread."""
+
+    def __init__(self, latency=0.0, host="127.0.0.1", port=0):
+        self.graph = FakeGraph(latency)
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.graph = self.graph
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="fake-graph", daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1.0"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
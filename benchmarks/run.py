@@ -0,0 +1,326 @@
+"""Benchmark the app's storage, catalog and table paths against local stand-ins.
+
+S3 is served by moto's server mode (or any S3-compatible endpoint passed with
+--s3-endpoint, e.g. MinIO) and Microsoft Graph by benchmarks/fake_graph.py, both
+seeded with a synthetic corpus derived from --seed. The real functions in utils/
+are timed unchanged; only their endpoints point at the stand-ins.
+
+    python -m benchmarks.run --scale small
+    python -m benchmarks.run --questions 20000 --files 5000 --iterations 50 --json results.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import socket
+import sys
+import tempfile
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import make_file_bytes, make_file_names, make_questions
+from benchmarks.fake_graph import SITE_ID, FakeGraphServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCALES = {
+    "small": {"questions": 1000, "files": 100},
+    "medium": {"questions": 10000, "files": 5000},
+    "large": {"questions": 100000, "files": 50000}
+}
+BUCKET = "ground-truth-bench"
+TOKEN = "bench-token"
+SEED_WORKERS = 16
+
+SECRETS_TEMPLATE = """
+[aws]
+AWS_ACCESS_KEY_ID = "bench"
+AWS_SECRET_ACCESS_KEY = "bench"
+AWS_REGION = "us-east-1"
+S3_BUCKET_NAME = "{bucket}"
+S3_ENDPOINT_URL = "{endpoint}"
+
+[azure]
+TENANT_ID = "bench"
+CLIENT_ID = "bench"
+CLIENT_SECRET = "bench"
+"""
+
+class Meter:
+    """Counts requests and payload bytes per backend, as seen by the app's clients."""
+
+    def __init__(self):
+        self.counts = {"s3": [0, 0, 0], "graph": [0, 0, 0]}  # backend -> [calls, bytes sent, bytes received]
+
+    def add(self, backend, calls=0, sent=0, received=0):
+        counts = self.counts[backend]
+        counts[0] += calls
+        counts[1] += sent
+        counts[2] += received
+
+    def snapshot(self):
+        return {backend: list(counts) for backend, counts in self.counts.items()}
+
+    def attach_s3(self, client):
+        # before-send fires for every HTTP attempt (including retries and multipart parts)
+        def before_send(request, **kwargs):
+            self.add("s3", calls=1, sent=int(request.headers.get("Content-Length") or 0))
+
+        def after_call(http_response, **kwargs):
+            self.add("s3", received=int(http_response.headers.get("Content-Length") or 0))
+
+        client.meta.events.register("before-send.s3", before_send)
+        client.meta.events.register("after-call.s3", after_call)
+
+    def attach_graph(self, session):
+        def on_response(response, *args, **kwargs):
+            body = response.request.body or b""
+            self.add("graph", calls=1, sent=len(body), received=len(response.content or b""))
+        session.hooks["response"].append(on_response)
+
+def _percentile(values, percent):
+    """Nearest-rank percentile of a sorted list."""
+    return values[max(0, min(len(values) - 1, math.ceil(percent / 100 * len(values)) - 1))]
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_s3_stand_in():
+    """Start moto's S3 server on a free local port. Returns (endpoint URL, server)."""
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        sys.exit("The local S3 stand-in needs moto: pip install -r benchmarks/requirements.txt "
+                 "(or pass --s3-endpoint for an S3-compatible server such as MinIO).")
+    # Keep moto's per-request access log out of the report
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    port = _free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    return f"http://127.0.0.1:{port}", server
+
+def configure_app(endpoint):
+    """Point the app's secrets at the stand-ins; must run before utils is imported."""
+    workdir = tempfile.mkdtemp(prefix="gt-bench-")
+    os.makedirs(os.path.join(workdir, ".streamlit"))
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w") as secrets:
+        secrets.write(SECRETS_TEMPLATE.format(bucket=BUCKET, endpoint=endpoint))
+    # st.secrets is read from the working directory
+    os.chdir(workdir)
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    return workdir
+
+class Benchmark:
+    def __init__(self, meter, iterations):
+        self.meter = meter
+        self.iterations = iterations
+        self.results = []
+
+    def run(self, name, fn, setup=None, iterations=None):
+        """Time fn() over the iterations; setup() runs before each one, untimed."""
+        timings = []
+        totals = {"s3": [0, 0, 0], "graph": [0, 0, 0]}
+        iterations = iterations or self.iterations
+        for iteration in range(iterations):
+            if setup:
+                setup(iteration)
+            before = self.meter.snapshot()
+            start = time.perf_counter()
+            fn(iteration)
+            timings.append((time.perf_counter() - start) * 1000)
+            after = self.meter.snapshot()
+            for backend in totals:
+                for position in range(3):
+                    totals[backend][position] += after[backend][position] - before[backend][position]
+
+        timings.sort()
+        result = {
+            "name": name,
+            "iterations": iterations,
+            "p50_ms": _percentile(timings, 50),
+            "p95_ms": _percentile(timings, 95),
+            "p99_ms": _percentile(timings, 99),
+            "max_ms": timings[-1],
+            "mean_ms": sum(timings) / len(timings)
+        }
+        for backend, (calls, sent, received) in totals.items():
+            result[f"{backend}_calls"] = calls / iterations
+            result[f"{backend}_bytes_sent"] = sent / iterations
+            result[f"{backend}_bytes_received"] = received / iterations
+        self.results.append(result)
+        print(format_row(result), flush=True)
+        return result
+
+HEADER = (f"{'operation':<44} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} "
+          f"{'S3/op':>6} {'Graph/op':>8} {'KiB out':>9} {'KiB in':>9}")
+
+def format_row(result):
+    sent = (result["s3_bytes_sent"] + result["graph_bytes_sent"]) / 1024
+    received = (result["s3_bytes_received"] + result["graph_bytes_received"]) / 1024
+    return (f"{result['name']:<44} {result['iterations']:>4} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+            f"{result['p99_ms']:>9.2f} {result['max_ms']:>9.2f} {result['s3_calls']:>6.1f} "
+            f"{result['graph_calls']:>8.1f} {sent:>9.1f} {received:>9.1f}")
+
+def seed(args, graph):
+    """Create the bucket and load the synthetic corpus. Files are split between S3 and SharePoint."""
+    from utils.s3 import get_s3_client, write_json_to_s3
+    from utils.store import QUESTIONS_SNAPSHOT
+
+    client = get_s3_client()
+    client.create_bucket(Bucket=BUCKET)
+
+    file_names = make_file_names(args.files, args.seed)
+    questions = make_questions(args.questions, file_names, args.seed)
+    write_json_to_s3(QUESTIONS_SNAPSHOT, questions)
+
+    s3_names = file_names[::2]
+    sharepoint_names = file_names[1::2]
+    body = make_file_bytes(1024, args.seed)
+    with ThreadPoolExecutor(max_workers=SEED_WORKERS) as executor:
+        list(executor.map(lambda name: client.put_object(Bucket=BUCKET, Key=name, Body=body), s3_names))
+    for name in sharepoint_names:
+        graph.add_file(name, len(body))
+    return questions, file_names
+
+def run_benchmarks(args, meter):
+    import utils.catalog as catalog
+    import utils.s3 as s3
+    import utils.sharepoint as sharepoint
+
+    from utils.catalog import assign_unique_filenames, get_catalog_snapshot, invalidate_catalog
+    from utils.sharepoint import get_all_tags_from_list
+    from utils.store import QUESTIONS_SNAPSHOT, get_question_index, load_questions
+    from utils.table import build_questions_frame, get_questions_frame, query_questions_frame
+    from utils.upload import upload_to_backends
+
+    bench = Benchmark(meter, args.iterations)
+    questions = load_questions(force=True)
+    snapshot_key = f"{s3.S3_FOLDER}{QUESTIONS_SNAPSHOT}"
+
+    def drop_json_cache(iteration):
+        s3.invalidate_json_cache(QUESTIONS_SNAPSHOT)
+
+    def expire_json_cache(iteration):
+        with s3._json_cache_lock:
+            if snapshot_key in s3._json_cache:
+                s3._json_cache[snapshot_key]["checked_at"] = 0.0
+
+    bench.run("read_json_from_s3 (cold)", lambda i: s3.read_json_from_s3(QUESTIONS_SNAPSHOT), setup=drop_json_cache)
+    bench.run("read_json_from_s3 (revalidate, unchanged)", lambda i: s3.read_json_from_s3(QUESTIONS_SNAPSHOT),
+              setup=expire_json_cache)
+    bench.run("read_json_from_s3 (cached)", lambda i: s3.read_json_from_s3(QUESTIONS_SNAPSHOT))
+    bench.run("write_json_to_s3", lambda i: s3.write_json_to_s3(QUESTIONS_SNAPSHOT, questions))
+    bench.run("load_questions (refresh)", lambda i: load_questions(force=True))
+
+    def reset_catalog(iteration):
+        # Forget the delta link as well, so SharePoint is enumerated from scratch
+        with catalog._catalog_lock:
+            catalog._catalog.update({"drive_id": None, "delta_link": None, "sharepoint": {}, "s3": {}})
+        invalidate_catalog()
+
+    def refresh_catalog(iteration):
+        invalidate_catalog()
+
+    def get_files_from_storage(force=False, deadline=None):
+        drive_id = sharepoint.get_document_drive_id(TOKEN, SITE_ID)
+        return get_catalog_snapshot(TOKEN, drive_id, force=force, deadline=deadline)["files"]
+
+    bench.run("get_files_from_storage (cold catalog)", lambda i: get_files_from_storage(), setup=reset_catalog,
+              iterations=min(args.iterations, 5))
+    bench.run("get_files_from_storage (delta refresh)", lambda i: get_files_from_storage(), setup=refresh_catalog)
+    bench.run("get_files_from_storage (cached)", lambda i: get_files_from_storage())
+
+    file_names = [file["name"] for file in get_files_from_storage()]
+
+    def unique_filename(iteration):
+        existing_filenames = {file["name"] for file in get_files_from_storage()}
+        return assign_unique_filenames([file_names[iteration % len(file_names)]], existing_filenames)[0]
+
+    bench.run("get_unique_filename", unique_filename)
+
+    upload_body = make_file_bytes(args.upload_size, args.seed + 1)
+    bench.run(f"upload_to_storage ({args.upload_size // 1024} KiB)",
+              lambda i: upload_to_backends(f"bench-upload-{time.time_ns()}.pdf", upload_body, TOKEN, SITE_ID),
+              iterations=min(args.iterations, 10))
+
+    bench.run("get_all_tags_from_list", lambda i: get_all_tags_from_list(questions))
+    bench.run("View Questions frame build", lambda i: build_questions_frame(get_question_index().questions),
+              iterations=min(args.iterations, 10))
+    get_questions_frame()
+    agents = get_question_index().agents()[:2]
+    tags = get_question_index().tags()[:3]
+    bench.run("View Questions filter + sort (cached frame)",
+              lambda i: query_questions_frame(tags=tags, agents=agents, sort_by="Created On", ascending=False))
+    return bench.results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", choices=SCALES, default="small", help="corpus preset (default: small)")
+    parser.add_argument("--questions", type=int, help="number of synthetic questions (overrides --scale)")
+    parser.add_argument("--files", type=int, help="number of synthetic files (overrides --scale)")
+    parser.add_argument("--iterations", type=int, default=20, help="timed runs per operation")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed")
+    parser.add_argument("--upload-size", type=int, default=256 * 1024, help="bytes per uploaded file")
+    parser.add_argument("--graph-latency", type=float, default=0.0, help="seconds added to every fake Graph request")
+    parser.add_argument("--s3-endpoint", help="use this S3-compatible endpoint instead of starting moto")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args(argv)
+    args.questions = args.questions if args.questions is not None else SCALES[args.scale]["questions"]
+    args.files = args.files if args.files is not None else SCALES[args.scale]["files"]
+    if args.json_path:
+        args.json_path = os.path.abspath(args.json_path)
+
+    s3_server = None
+    if args.s3_endpoint:
+        endpoint = args.s3_endpoint
+    else:
+        endpoint, s3_server = start_s3_stand_in()
+    graph_server = FakeGraphServer(latency=args.graph_latency).start()
+
+    try:
+        configure_app(endpoint)
+        import streamlit as st
+        import streamlit.logger
+        # utils runs outside "streamlit run" here; load the config first (it resets the
+        # log level) and then keep the bare-mode warnings out of the report
+        st.secrets.load_if_toml_exists()
+        streamlit.logger.set_log_level("error")
+
+        import utils.sharepoint as sharepoint
+        from utils.graph import graph_client
+        from utils.s3 import get_s3_client
+
+        sharepoint.GRAPH_API_BASE_URL = graph_server.base_url
+        meter = Meter()
+        meter.attach_s3(get_s3_client())
+        meter.attach_graph(graph_client.session)
+
+        print(f"Seeding {args.questions} questions and {args.files} files (seed {args.seed})...", flush=True)
+        seed(args, graph_server.graph)
+        print(f"Python {platform.python_version()} on {platform.platform()}\n")
+        print(HEADER)
+        results = run_benchmarks(args, meter)
+    finally:
+        graph_server.stop()
+        if s3_server is not None:
+            s3_server.stop()
+
+    if args.json_path:
+        with open(args.json_path, "w") as output:
+            json.dump({
+                "questions": args.questions,
+                "files": args.files,
+                "seed": args.seed,
+                "iterations": args.iterations,
+                "python": platform.python_version(),
+                "results": results
+            }, output, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,31 @@
 import streamlit as st
 import pandas as pd
-import os
-import tempfile
 
-from streamlit_option_menu import option_menu
 from utils import (
-    logout, get_document_libraries, get_files_in_eval_benchmark, get_file_item,
-    upload_to_eval_benchmark, get_all_tags_from_list, 
+    logout, get_document_drive_id, get_graph_token,
     add_document, remove_document, handle_new_tag
 )
-from utils.s3 import upload_file, list_files, read_json_from_s3, write_json_to_s3
+from utils.bulk_import import detect_format, import_questions
+from utils.export import schedule_parquet_export
+from utils.catalog import (
+    get_catalog_snapshot, get_content_index, find_stored_copy, hash_content, assign_unique_filenames
+)
+from utils.upload import UPLOAD_CONCURRENCY, upload_files
+from utils.store import append_question
+from utils.table import SORT_COLUMNS, get_filter_options, text_search_ids, query_questions_frame, page_of
 
 # Page configuration
 st.set_page_config(page_title="Ground Truth Benchmark", layout="wide", initial_sidebar_state="expanded")
 
-# Load questions from S3
-try:
-    QUESTIONS = read_json_from_s3("submitted_questions.json")
-    if QUESTIONS is None or not isinstance(QUESTIONS, list):
-        QUESTIONS = []
-        write_json_to_s3("submitted_questions.json", [])
-except Exception:
-    QUESTIONS = []
-    write_json_to_s3("submitted_questions.json", [])
-
 # Authentication check
 if "authenticated" not in st.session_state or not st.session_state["authenticated"]:
     st.warning("Please log in first.")
     st.switch_page("pages/login.py")
 
+# Keep the session's SharePoint token current from the shared token cache
+if st.session_state.get("token"):
+    st.session_state["token"] = get_graph_token() or st.session_state["token"]
+
 # CSS
 st.markdown("""
     <style>
@@ -52,88 +49,44 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Need to moves these to functions 
-def get_files_from_storage():
-    """Get files from both SharePoint and S3 storage."""
-    files = []
-    
-    # Get SharePoint files
-    TOKEN = st.session_state.get("token")
-    SITE_ID = st.session_state.get("site_id")
-    if TOKEN and SITE_ID:
-        drive_id = st.session_state.get("document_drive_id")
-        if drive_id:
-            sharepoint_files = get_files_in_eval_benchmark(TOKEN, drive_id)
-            if sharepoint_files:
-                for file in sharepoint_files:
-                    if "folder" not in file:
-                        files.append({
-                            "name": file["name"],
-                            "source": "SharePoint",
-                            "lastModified": file.get("lastModifiedDateTime", ""),
-                            "createdBy": file.get("createdBy", {}).get("user", {}).get("displayName", "Unknown")
-                        })
-
-    # Get S3 files
-    s3_files = list_files()
-    for file_name in s3_files:
-        files.append({
-            "name": file_name,
-            "source": "S3",
-            "lastModified": pd.Timestamp.now().strftime("%Y-%m-%d"),
-            "createdBy": "Unknown"
-        })
-
-    return files
-
-def upload_to_storage(file_name, file_bytes):
-    results = []
+def get_files_from_storage(force=False):
+    """Get files from both SharePoint and S3 storage (served from the shared catalog)."""
     TOKEN = st.session_state.get("token")
     SITE_ID = st.session_state.get("site_id")
-    
-    if TOKEN and SITE_ID:
-        try:
-            sharepoint_result = upload_to_eval_benchmark(TOKEN, SITE_ID, file_name, file_bytes)
-            results.append(("SharePoint", sharepoint_result))
-        except Exception:
-            results.append(("SharePoint", False))
-
-    try:
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file_path = temp_file.name
-            temp_file.write(file_bytes)
-        
-        s3_result = upload_file(temp_file_path, target_filename=file_name)  
-        results.append(("S3", s3_result))
-    except Exception:
-        results.append(("S3", False))
-    finally:
-        try:
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-        except Exception:
-            pass
-
-    return results
-
-def get_unique_filename(original_filename):
-    """Generate unique filename to avoid overwriting existing files."""
+    drive_id = get_document_drive_id(TOKEN, SITE_ID) if TOKEN and SITE_ID else None
+    snapshot = get_catalog_snapshot(TOKEN, drive_id, force=force)
+    if snapshot["stale"]:
+        st.caption(f"{' and '.join(snapshot['stale'])} file list is still refreshing; showing the last known files.")
+    return snapshot["files"]
+
+def get_unique_filenames(original_filenames, existing_filenames=None):
+    """Generate unique filenames for a batch of files from a single storage listing."""
+    if existing_filenames is None:
+        existing_filenames = {file["name"] for file in get_files_from_storage()}
+    return assign_unique_filenames(original_filenames, existing_filenames)
+
+def plan_upload_batch(uploaded_files):
+    """Hash a batch of uploaded files and decide which ones actually need uploading.
+
+    Returns one dict per file with its SHA-256, the name to upload it under and,
+    for content that is already stored (or repeated in the batch), the existing
+    file name it is linked to instead.
+    """
     existing_filenames = {file["name"] for file in get_files_from_storage()}
-    
-    if original_filename not in existing_filenames:
-        return original_filename
-        
-    name_parts = original_filename.rsplit('.', 1)
-    base_name = name_parts[0]
-    extension = f".{name_parts[1]}" if len(name_parts) > 1 else ""
-
-    counter = 1
-    new_filename = original_filename
-    
-    while new_filename in existing_filenames:
-        new_filename = f"{base_name} copy({counter}){extension}"
-        counter += 1
-        
-    return new_filename
+    content_index = get_content_index()
+
+    plan = []
+    batch_names = {}
+    for uploaded_file in uploaded_files:
+        sha256 = hash_content(uploaded_file)
+        duplicate_of = find_stored_copy(sha256, existing_filenames, content_index) or batch_names.get(sha256)
+        entry = {"original": uploaded_file.name, "sha256": sha256, "name": None, "duplicate_of": duplicate_of}
+        if not duplicate_of:
+            entry["name"] = get_unique_filenames([uploaded_file.name], existing_filenames)[0]
+            existing_filenames.add(entry["name"])
+            batch_names[sha256] = entry["name"]
+        plan.append(entry)
+    return plan
 
 # Sidebar navigation
 with st.sidebar:
@@ -141,6 +94,8 @@ with st.sidebar:
         st.session_state['option'] = "Add New Question"
     if st.button("View Questions"):
         st.session_state['option'] = "View Questions"
+    if st.button("Import Questions"):
+        st.session_state['option'] = "Import Questions"
     if st.button("View and Upload Documents"):
         st.session_state['option'] = "View and Upload Documents"    
     if st.sidebar.button("Logout"):
@@ -182,21 +137,15 @@ else:
         agent_name = st.text_input("Agent Name", key="agent_name_input")
 
         # Document selection section
-        libraries = get_document_libraries(TOKEN, SITE_ID)
-        drive_id = None
-        for lib in libraries:
-            if "document" in lib["name"].lower():
-                drive_id = lib["id"]
-                st.session_state["document_drive_id"] = drive_id
-                break
+        drive_id = get_document_drive_id(TOKEN, SITE_ID)
+        if drive_id:
+            st.session_state["document_drive_id"] = drive_id
                 
         # Get files
-        if 'all_files' not in st.session_state or st.session_state.get('refresh_files', False):
-            all_files = get_files_from_storage()
-            st.session_state['all_files'] = all_files
-            st.session_state['refresh_files'] = False
-        
-        all_files = st.session_state['all_files']
+        all_files = get_files_from_storage(force=st.session_state.get('refresh_files', False))
+        st.session_state['all_files'] = all_files
+        st.session_state['refresh_files'] = False
+
         # Ensure unique filenames in dropdown regardless of storage source
         available_files = list(set(file["name"] for file in all_files))
 
@@ -242,15 +191,17 @@ else:
         st.button("+ ADD DOCUMENT", key="add_doc_btn", on_click=add_document)
 
         # Tags section
-        existing_tags = get_all_tags_from_list(QUESTIONS)
+        existing_tags = get_filter_options("tags")
 
         if 'selected_tags' not in st.session_state:
             st.session_state['selected_tags'] = []
 
-        all_tags = list(existing_tags)
+        all_tags = existing_tags
+        known_tags = set(existing_tags)
         for tag in st.session_state['selected_tags']:
-            if tag not in all_tags:
+            if tag not in known_tags:
                 all_tags.append(tag)
+                known_tags.add(tag)
 
         selected_tags = st.multiselect(
             "Select Tags", 
@@ -311,42 +262,130 @@ else:
                 }
 
                 # Add to database
-                QUESTIONS.append(new_entry)
-                write_json_to_s3("submitted_questions.json", QUESTIONS)
-                
-                st.session_state['form_submitted'] = True
-                st.rerun()
+                stored_entry = append_question(new_entry)
+                if stored_entry is None:
+                    st.error("Error saving question to S3. Please try again.")
+                else:
+                    schedule_parquet_export()
+                    st.session_state['form_submitted'] = True
+                    st.rerun()
 
     # VIEW QUESTIONS PAGE
     elif option == "View Questions":
         st.header("Ground Truth Library")
 
-        questions = QUESTIONS
-        
-        if questions:
-            data = {
-                "Question": [q.get("Question", "") for q in questions],
-                "Ideal Answer": [q.get("Ideal Answer", "") for q in questions],
-                "Reference Documents": [
-                    "\n".join([
-                        f"- {doc.get('name', '')} (Pages {doc.get('pages', '')}) [{doc.get('source', 'Unknown')}]" 
-                        for doc in q.get("Reference Documents", [])
-                    ]) for q in questions
-                ],
-                "Agent Name": [q.get("Agent Name", "") for q in questions],
-                "Tags": [", ".join(q.get("Tags", [])) for q in questions],
-                "Created On": [q.get("Created On", "") for q in questions],
-                "Submitted By": [q.get("Submitted By", "Unknown") for q in questions]
-            }
-            df = pd.DataFrame(data)
-            st.dataframe(df, width=3000, height=500)
+        search_query = st.text_input("Search Questions", key="question_search", help="Search question and ideal answer text")
+
+        with st.expander("Filter and Sort"):
+            filter_cols = st.columns(3)
+            with filter_cols[0]:
+                filter_tags = st.multiselect("Tags", options=get_filter_options("tags"), key="filter_tags")
+            with filter_cols[1]:
+                filter_agents = st.multiselect("Agent Name", options=get_filter_options("agents"), key="filter_agents")
+            with filter_cols[2]:
+                filter_submitters = st.multiselect("Submitted By", options=get_filter_options("submitters"), key="filter_submitters")
+
+            range_cols = st.columns(4)
+            with range_cols[0]:
+                date_from = st.date_input("Created From", value=None, key="filter_date_from")
+            with range_cols[1]:
+                date_to = st.date_input("Created To", value=None, key="filter_date_to")
+            with range_cols[2]:
+                sort_by = st.selectbox("Sort By", options=["Submission Order"] + SORT_COLUMNS, key="sort_by")
+            with range_cols[3]:
+                sort_order = st.radio("Order", options=["Ascending", "Descending"], horizontal=True, key="sort_order")
+
+        search_ids = text_search_ids(search_query, k=50) if search_query.strip() else None
+        filtered = query_questions_frame(
+            ids=search_ids,
+            tags=filter_tags,
+            agents=filter_agents,
+            submitters=filter_submitters,
+            date_from=date_from,
+            date_to=date_to,
+            sort_by=sort_by,
+            ascending=sort_order == "Ascending"
+        )
+
+        if len(filtered):
+            page_cols = st.columns([1, 1, 4])
+            with page_cols[0]:
+                page_size = st.selectbox("Rows per page", options=[25, 50, 100, 250], key="page_size")
+            n_pages = max(1, -(-len(filtered) // page_size))
+            with page_cols[1]:
+                page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key="page_number")
+
+            page_df, n_pages = page_of(filtered, int(page), page_size)
+            start = (min(int(page), n_pages) - 1) * page_size
+            st.caption(f"Showing {start + 1}-{start + len(page_df)} of {len(filtered)} questions")
+            st.dataframe(page_df.reset_index(drop=True), width=3000, height=500)
+        elif search_ids is not None or filter_tags or filter_agents or filter_submitters or date_from or date_to:
+            st.info("No questions match your search.")
         else:
             st.info("No questions found. Add new questions in the 'Add New Question' section.")
-            
+
+    # BULK IMPORT PAGE
+    elif option == "Import Questions":
+        st.header("Import Questions")
+        st.caption(
+            "Upload a CSV or JSONL file with the columns Question, Ideal Answer, Agent Name, Tags "
+            "and Reference Documents. The whole file is stored in a single write."
+        )
+
+        import_file = st.file_uploader("Choose a CSV or JSONL file", type=["csv", "jsonl", "ndjson"], key="import_file")
+        skip_invalid = st.checkbox("Import valid rows even if some rows are invalid", key="import_skip_invalid")
+
+        if import_file is not None:
+            import_cols = st.columns(2)
+            with import_cols[0]:
+                validate_clicked = st.button("Validate", key="import_validate_btn")
+            with import_cols[1]:
+                import_clicked = st.button("Import", key="import_btn")
+
+            if validate_clicked or import_clicked:
+                drive_id = get_document_drive_id(TOKEN, SITE_ID)
+                files = get_catalog_snapshot(TOKEN, drive_id)["files"]
+                import_file.seek(0)
+                with st.spinner("Reading file..."):
+                    report = import_questions(
+                        import_file,
+                        detect_format(import_file.name),
+                        files,
+                        submitted_by=st.session_state.get("username", "Unknown"),
+                        skip_invalid=skip_invalid,
+                        dry_run=validate_clicked,
+                        token=TOKEN,
+                        drive_id=drive_id
+                    )
+
+                st.write(f"Read {report['rows']} rows, {report['error_count']} invalid.")
+                if report["errors"]:
+                    st.dataframe(pd.DataFrame(report["errors"], columns=["Row", "Error"]), hide_index=True)
+                if report["unresolved_documents"]:
+                    st.warning(
+                        f"{len(report['unresolved_documents'])} referenced documents are not in the file catalog "
+                        "and will be stored with source \"Unknown\": " + ", ".join(report["unresolved_documents"])
+                    )
+
+                if report["stored"]:
+                    schedule_parquet_export()
+                    st.success(f"Imported {report['imported']} questions.")
+                elif import_clicked and report["rows"] == report["error_count"]:
+                    st.error("No valid rows to import.")
+                elif import_clicked and report["error_count"] and not skip_invalid:
+                    st.error("Nothing was imported. Fix the invalid rows or choose to import the valid rows only.")
+                elif import_clicked:
+                    st.error("Error saving questions to S3. Please try again.")
+                elif validate_clicked and not report["error_count"]:
+                    st.success("All rows are valid.")
+
     # DOCUMENT MANAGEMENT PAGE
     elif option == "View and Upload Documents":
         st.header("Document Management")
 
+        # Only this page uses the option menu component
+        from streamlit_option_menu import option_menu
+
         selected_page = option_menu(
             menu_title="",
             options=["File List", "Upload New File"],
@@ -401,27 +440,56 @@ else:
             if uploaded_files:
                 files_to_upload = []
                 
+                # Hash and resolve names once per set of selected files, not on every rerun
+                batch_key = tuple(
+                    (f.name, f.size, getattr(f, "file_id", None)) for f in uploaded_files
+                )
+                if st.session_state.get('upload_batch_key') != batch_key:
+                    st.session_state['upload_batch_plan'] = plan_upload_batch(uploaded_files)
+                    st.session_state['upload_batch_key'] = batch_key
+                upload_plan = st.session_state['upload_batch_plan']
+                content_hashes = {}
+
                 # Preview files and show renamed info
                 st.subheader("Files Ready to Upload:")
-                for uploaded_file in uploaded_files:
-                    file_bytes = uploaded_file.getvalue()
+                for uploaded_file, planned in zip(uploaded_files, upload_plan):
                     original_filename = uploaded_file.name
-                    upload_filename = get_unique_filename(original_filename)
-                    
+
+                    if planned["duplicate_of"]:
+                        st.write(f"**{original_filename}** (identical to stored file {planned['duplicate_of']}, not uploaded again)")
+                        continue
+
+                    upload_filename = planned["name"]
                     file_info = f"**{upload_filename}**"
                     if upload_filename != original_filename:
                         file_info += f" (renamed from {original_filename})"
                     
                     st.write(file_info)
-                    files_to_upload.append((upload_filename, file_bytes))
+                    files_to_upload.append((upload_filename, uploaded_file.getvalue()))
+                    content_hashes[upload_filename] = planned["sha256"]
 
-                if st.button("Upload All Files"):
+                if not files_to_upload:
+                    st.info("All selected files are already stored. Select them by name when adding a question.")
+                elif st.button("Upload All Files"):
                     with st.spinner(f"Uploading {len(files_to_upload)} files..."):
                         successful_files = []
                         failed_files = []
+                        progress_bar = st.progress(0.0, text=f"Uploaded 0 of {len(files_to_upload)} files")
+
+                        def show_progress(done, total, filename, upload_results):
+                            progress_bar.progress(done / total, text=f"Uploaded {done} of {total} files ({filename})")
+
+                        all_results = upload_files(
+                            files_to_upload,
+                            token=st.session_state.get("token"),
+                            site_id=st.session_state.get("site_id"),
+                            max_concurrency=UPLOAD_CONCURRENCY,
+                            on_progress=show_progress,
+                            content_hashes=content_hashes
+                        )
                         
-                        for filename, file_bytes in files_to_upload:
-                            upload_results = upload_to_storage(filename, file_bytes)
+                        for filename, _ in files_to_upload:
+                            upload_results = all_results[filename]
                             successful_uploads = [storage for storage, result in upload_results if result]
                             failed_uploads = [storage for storage, result in upload_results if not result]
                             
@@ -450,3 +518,4 @@ else:
                         st.error("All uploads failed. Please check your connection and try again.")
                     
                     st.session_state['refresh_files'] = True
+                    st.session_state['upload_batch_key'] = None
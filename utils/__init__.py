@@ -1,71 +1,133 @@
-# Authentication functions
-from utils.auth import (
-    get_json_db,
-    check_rate_limit,
-    authenticate_user,
-    check_session_timeout,
-    logout,
-    check_login,
-)
-
-# SharePoint functions
-from utils.sharepoint import (
-    get_document_libraries,
-    get_files_in_eval_benchmark,
-    get_file_item,
-    upload_to_eval_benchmark,
-    get_access_token,
-    get_site_id,
-    get_all_tags_from_list,
-    get_all_documents_from_list
-)
-
-# UI helper functions
-from utils.form import (
-    add_document,
-    remove_document,
-    handle_new_tag
-)
-
-# S3 functions
-from utils.s3 import (
-    upload_file, 
-    list_files, 
-    file_exists,
-    read_json_from_s3,
-    write_json_to_s3
-)
-
-__all__ = [
-    # Auth functions
-    'get_json_db',
-    'check_rate_limit',
-    'authenticate_user', 
-    'check_session_timeout',
-    'logout', 
-    'check_login',
-    
+"""Utility functions & reusable components.
+
+Names are resolved lazily on first access, so importing one helper (e.g. from
+the login page) does not import boto3, pandas or the Graph client with it.
+"""
+import importlib
+
+# Public name -> defining module
+_LAZY_IMPORTS = {
+    # Authentication functions
+    'get_json_db': 'utils.auth',
+    'check_rate_limit': 'utils.auth',
+    'authenticate_user': 'utils.auth',
+    'check_session_timeout': 'utils.auth',
+    'logout': 'utils.auth',
+    'check_login': 'utils.auth',
+    'verify_password': 'utils.auth',
+    'get_login_stats': 'utils.auth',
+    'RateLimiter': 'utils.ratelimit',
+
     # SharePoint functions
-    'get_document_libraries',
-    'get_files_in_eval_benchmark',
-    'get_file_item',
-    'upload_to_eval_benchmark',
-    'get_access_token',
-    'get_site_id',
-    
-    # List-based functions (previously DB functions)
-    'get_all_tags_from_list',
-    'get_all_documents_from_list',
-    
+    'get_document_libraries': 'utils.sharepoint',
+    'get_files_in_eval_benchmark': 'utils.sharepoint',
+    'iter_files_in_eval_benchmark': 'utils.sharepoint',
+    'iter_graph_collection': 'utils.sharepoint',
+    'get_eval_benchmark_folder': 'utils.sharepoint',
+    'get_eval_benchmark_folder_id': 'utils.sharepoint',
+    'get_document_drive_id': 'utils.sharepoint',
+    'invalidate_sharepoint_location': 'utils.sharepoint',
+    'get_drive_delta': 'utils.sharepoint',
+    'get_file_item': 'utils.sharepoint',
+    'get_file_items': 'utils.sharepoint',
+    'graph_batch': 'utils.sharepoint',
+    'upload_to_eval_benchmark': 'utils.sharepoint',
+    'create_upload_session': 'utils.sharepoint',
+    'upload_in_chunks': 'utils.sharepoint',
+    'get_access_token': 'utils.sharepoint',
+    'request_access_token': 'utils.sharepoint',
+    'get_token_provider': 'utils.sharepoint',
+    'get_graph_token': 'utils.sharepoint',
+    'TokenProvider': 'utils.sharepoint',
+    'get_site_id': 'utils.sharepoint',
+    'get_all_tags_from_list': 'utils.sharepoint',
+    'get_all_documents_from_list': 'utils.sharepoint',
+
+    # Graph HTTP client
+    'GraphClient': 'utils.graph',
+    'graph_client': 'utils.graph',
+
     # UI helper functions
-    'add_document',
-    'remove_document',
-    'handle_new_tag',
-    
+    'add_document': 'utils.form',
+    'remove_document': 'utils.form',
+    'handle_new_tag': 'utils.form',
+
     # S3 functions
-    'upload_file', 
-    'list_files', 
-    'file_exists',
-    'read_json_from_s3',
-    'write_json_to_s3'
-]
+    'upload_file': 'utils.s3',
+    'upload_bytes': 'utils.s3',
+    'upload_stream': 'utils.s3',
+    'list_files': 'utils.s3',
+    'iter_files': 'utils.s3',
+    'file_exists': 'utils.s3',
+    'read_json_from_s3': 'utils.s3',
+    'write_json_to_s3': 'utils.s3',
+    'update_json_in_s3': 'utils.s3',
+    'invalidate_json_cache': 'utils.s3',
+    'get_s3_client': 'utils.s3',
+
+    # Question store
+    'load_questions': 'utils.store',
+    'append_question': 'utils.store',
+    'append_questions': 'utils.store',
+    'compact_questions': 'utils.store',
+    'schedule_compaction': 'utils.store',
+    'get_question_index': 'utils.store',
+    'get_store_version': 'utils.store',
+    'search_questions': 'utils.store',
+    'search_question_ids': 'utils.store',
+
+    # Bulk question import
+    'import_questions': 'utils.bulk_import',
+    'parse_question_row': 'utils.bulk_import',
+    'find_sharepoint_documents': 'utils.bulk_import',
+
+    # Parquet export
+    'export_questions_parquet': 'utils.export',
+    'schedule_parquet_export': 'utils.export',
+    'read_questions_parquet': 'utils.export',
+    'get_parquet_manifest': 'utils.export',
+
+    # Question index and search
+    'QuestionIndex': 'utils.index',
+    'SearchIndex': 'utils.search',
+
+    # Question table
+    'get_questions_frame': 'utils.table',
+    'get_filter_options': 'utils.table',
+    'text_search_ids': 'utils.table',
+    'query_questions_frame': 'utils.table',
+    'page_of': 'utils.table',
+
+    # SQLite read replica
+    'replica_enabled': 'utils.replica',
+    'replica_values': 'utils.replica',
+    'replica_question_ids': 'utils.replica',
+
+    # File catalog
+    'get_catalog_files': 'utils.catalog',
+    'get_catalog_snapshot': 'utils.catalog',
+    'record_upload': 'utils.catalog',
+    'invalidate_catalog': 'utils.catalog',
+    'assign_unique_filenames': 'utils.catalog',
+    'hash_content': 'utils.catalog',
+    'get_content_index': 'utils.catalog',
+    'find_stored_copy': 'utils.catalog',
+    'record_content_hashes': 'utils.catalog',
+
+    # Upload pipeline
+    'upload_files': 'utils.upload',
+    'upload_to_backends': 'utils.upload'
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
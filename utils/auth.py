@@ -1,17 +1,38 @@
 import streamlit as st
 import time
 import datetime
+import logging
+import threading
 import bcrypt
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
 from utils.s3 import read_json_from_s3, write_json_to_s3
+from utils.ratelimit import RateLimiter
 
-failed_attempts = {}
 RATE_LIMIT_MAX_ATTEMPTS = 5
 RATE_LIMIT_WINDOW = 300  # 5 minutes
+# "memory" (per process) or "s3" (shared by all replicas), set under [auth] in secrets
+RATE_LIMIT_BACKEND = st.secrets.get("auth", {}).get("RATE_LIMIT_BACKEND", "memory")
 SESSION_TIMEOUT = 1800  # 30 minutes
+VERIFY_WORKERS = 4  # concurrent bcrypt checks; bcrypt releases the GIL while hashing
+VERIFY_TIMEOUT = 20  # seconds a login waits for its password check
+VERIFY_SLOW = 2  # seconds; slower password checks log the pool stats
+LOGIN_STATS_INTERVAL = 300  # seconds between routine pool stats log lines
+
+logger = logging.getLogger(__name__)
+
+# Password checks run on a bounded pool so a burst of logins queues here instead of
+# tying up every script thread with bcrypt at once
+_verify_executor = ThreadPoolExecutor(max_workers=VERIFY_WORKERS, thread_name_prefix="bcrypt")
+_verify_stats = {"queued": 0, "running": 0, "completed": 0, "samples": deque(maxlen=500), "logged_at": time.time()}
+_verify_stats_lock = threading.Lock()
+
+rate_limiter = RateLimiter(RATE_LIMIT_MAX_ATTEMPTS, RATE_LIMIT_WINDOW, RATE_LIMIT_BACKEND)
 
 def get_json_db():
-    """Retrieve the user database from S3."""
+    """Retrieve the user database from S3 (cached process-wide, revalidated by ETag)."""
     try:
         data = read_json_from_s3("users.json")
         if not data:
@@ -24,33 +45,91 @@ def get_json_db():
 
 def check_rate_limit(username):
     """Check if the user has exceeded the allowed login attempts."""
-    current_time = time.time()
-    
-    # Clear old failed attempts
-    for user in list(failed_attempts.keys()):
-        if current_time - failed_attempts[user]["timestamp"] > RATE_LIMIT_WINDOW:
-            del failed_attempts[user]
-    
-    # Check if the user is rate limited
-    if username in failed_attempts:
-        attempts = failed_attempts[username]
-        if attempts["count"] >= RATE_LIMIT_MAX_ATTEMPTS:
-            if current_time - attempts["timestamp"] < RATE_LIMIT_WINDOW:
-                minutes_left = int((attempts['timestamp'] + RATE_LIMIT_WINDOW - current_time) / 60)
-                return False, f"Too many failed attempts. Try again in {minutes_left} minutes."
-            else:
-                failed_attempts[username] = {"count": 0, "timestamp": current_time}
+    try:
+        allowed, seconds_left = rate_limiter.check(username)
+    except Exception:
+        return True, ""
+
+    if not allowed:
+        minutes_left = int(seconds_left / 60)
+        return False, f"Too many failed attempts. Try again in {minutes_left} minutes."
     
     return True, ""
 
 def record_failed_attempt(username):
     """Record a failed login attempt."""
-    current_time = time.time()
-    if username in failed_attempts:
-        failed_attempts[username]["count"] += 1
-        failed_attempts[username]["timestamp"] = current_time
-    else:
-        failed_attempts[username] = {"count": 1, "timestamp": current_time}
+    try:
+        rate_limiter.record_failure(username)
+    except Exception:
+        pass
+
+def _checkpw(password, stored_password, submitted_at):
+    """Run bcrypt on a worker thread and record queue wait and verify time."""
+    started = time.time()
+    with _verify_stats_lock:
+        _verify_stats["queued"] -= 1
+        _verify_stats["running"] += 1
+    try:
+        return bcrypt.checkpw(password, stored_password)
+    finally:
+        finished = time.time()
+        with _verify_stats_lock:
+            _verify_stats["running"] -= 1
+            _verify_stats["completed"] += 1
+            _verify_stats["samples"].append((started - submitted_at, finished - started))
+
+def verify_password(password, stored_password):
+    """Check a password against its bcrypt hash on the verification pool."""
+    with _verify_stats_lock:
+        _verify_stats["queued"] += 1
+    submitted_at = time.time()
+    future = _verify_executor.submit(
+        _checkpw, password.encode('utf-8'), stored_password.encode('utf-8'), submitted_at
+    )
+    try:
+        result = future.result(timeout=VERIFY_TIMEOUT)
+    except FutureTimeoutError:
+        logger.warning("Password check timed out after %ss: %s", VERIFY_TIMEOUT, get_login_stats())
+        raise
+    _log_login_stats(time.time() - submitted_at)
+    return result
+
+def _log_login_stats(elapsed):
+    """Log the pool stats when a check was slow, and routinely every LOGIN_STATS_INTERVAL."""
+    now = time.time()
+    with _verify_stats_lock:
+        due = now - _verify_stats["logged_at"] >= LOGIN_STATS_INTERVAL
+        if due or elapsed >= VERIFY_SLOW:
+            _verify_stats["logged_at"] = now
+    if elapsed >= VERIFY_SLOW:
+        logger.warning("Slow password check (%.2fs): %s", elapsed, get_login_stats())
+    elif due:
+        logger.info("Password check stats: %s", get_login_stats())
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def get_login_stats():
+    """Return queue depth and recent wait / verify latency percentiles (seconds) of password checks."""
+    with _verify_stats_lock:
+        samples = list(_verify_stats["samples"])
+        stats = {
+            "queue_depth": _verify_stats["queued"],
+            "running": _verify_stats["running"],
+            "completed": _verify_stats["completed"]
+        }
+    waits = [wait for wait, _ in samples]
+    verifies = [verify for _, verify in samples]
+    stats.update({
+        "wait_p50": _percentile(waits, 0.5),
+        "wait_p95": _percentile(waits, 0.95),
+        "verify_p50": _percentile(verifies, 0.5),
+        "verify_p95": _percentile(verifies, 0.95)
+    })
+    return stats
 
 def check_session_timeout():
     """Log the user out if the session has been inactive for too long."""
@@ -98,13 +177,16 @@ def authenticate_user(username, password):
         stored_password = user_data["password_hash"]
         
         try:
-            if bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8')):
+            if verify_password(password, stored_password):
                 st.session_state["authenticated"] = True
                 st.session_state["username"] = username
                 return True
             else:
                 record_failed_attempt(username)
                 return False
+        except FutureTimeoutError:
+            st.error("Login is busy right now. Please try again in a moment.")
+            return False
         except Exception:
             record_failed_attempt(username)
             return False
@@ -0,0 +1,251 @@
+import argparse
+import csv
+import datetime
+import io
+import json
+import sys
+
+from utils.store import append_questions
+
+IMPORT_FORMATS = ("csv", "jsonl")
+REQUIRED_FIELDS = ("Question", "Ideal Answer", "Agent Name")
+MAX_REPORTED_ERRORS = 100  # row errors kept in the report; all of them are counted
+
+# Rows use the same fields as the "Add New Question" form. In CSV files list values are
+# either JSON arrays or delimited text:
+#   Tags                 "tag one, tag two"
+#   Reference Documents  "report.pdf: 1,2; notes.docx"   (name, optional ": pages", ";" between documents)
+# "Created On" (YYYY-MM-DD) and "Submitted By" are optional and default to today / the importing user.
+
+def detect_format(file_name):
+    """Return "csv" or "jsonl" from a file name, or None."""
+    extension = file_name.rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+        return "csv"
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    return None
+
+def iter_import_rows(stream, fmt):
+    """Yield (row number, row dict or None) from a binary CSV or JSONL stream, one row at a time."""
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            for row_number, row in enumerate(csv.DictReader(text), start=2):
+                yield row_number, row
+        else:
+            for row_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield row_number, row if isinstance(row, dict) else None
+    finally:
+        # Leave the caller's stream open (e.g. a Streamlit upload reused on rerun)
+        text.detach()
+
+def _parse_list(value):
+    """Return a list from a JSON list, a JSON-array string or None."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.strip()
+        if not value.startswith("["):
+            return None
+        value = json.loads(value)
+    if not isinstance(value, list):
+        raise ValueError("expected a list")
+    return value
+
+def _parse_tags(value):
+    """Return the tags of a row as a list of strings."""
+    tags = _parse_list(value)
+    if tags is None:
+        tags = value.replace(";", ",").split(",")
+    return list(dict.fromkeys(str(tag).strip() for tag in tags if str(tag).strip()))
+
+def _parse_documents(value):
+    """Return the reference documents of a row as [{"name": ..., "pages": ...}]."""
+    documents = _parse_list(value)
+    if documents is None:
+        documents = []
+        for part in value.split(";"):
+            name, _, pages = part.partition(":")
+            documents.append({"name": name, "pages": pages})
+
+    parsed = []
+    for document in documents:
+        if isinstance(document, str):
+            document = {"name": document}
+        if not isinstance(document, dict):
+            raise ValueError("expected a document name or object")
+        name = str(document.get("name") or "").strip()
+        if name:
+            parsed.append({"name": name, "pages": str(document.get("pages") or "").strip()})
+    return parsed
+
+def parse_question_row(row, file_sources, submitted_by="Unknown", today=None):
+    """Validate one import row and return (entry, error message).
+
+    file_sources maps file names in the catalog to their sources; referenced
+    documents that are not in it are stored with source "Unknown".
+    """
+    if row is None:
+        return None, "Row is not a JSON object"
+    for field in REQUIRED_FIELDS:
+        if not str(row.get(field) or "").strip():
+            return None, f"{field} is required."
+
+    try:
+        tags = _parse_tags(row.get("Tags"))
+    except ValueError as e:
+        return None, f"Tags: {e}"
+    try:
+        documents = _parse_documents(row.get("Reference Documents"))
+    except ValueError as e:
+        return None, f"Reference Documents: {e}"
+
+    created_on = str(row.get("Created On") or "").strip()
+    if created_on:
+        try:
+            created_on = datetime.date.fromisoformat(created_on).isoformat()
+        except ValueError:
+            return None, f"Created On must be YYYY-MM-DD, got {created_on!r}"
+    else:
+        created_on = today or datetime.date.today().isoformat()
+
+    for document in documents:
+        document["source"] = file_sources.get(document["name"], "Unknown")
+
+    entry = {
+        "Question": str(row["Question"]),
+        "Ideal Answer": str(row["Ideal Answer"]),
+        "Reference Documents": documents,
+        "Agent Name": str(row["Agent Name"]).strip(),
+        "Tags": tags,
+        "Created On": created_on,
+        "Submitted By": str(row.get("Submitted By") or "").strip() or submitted_by
+    }
+    return entry, None
+
+def get_file_sources(files):
+    """Return {file name: "S3, SharePoint"} from catalog entries, as the form records sources."""
+    sources = {}
+    for file in files:
+        sources.setdefault(file["name"], set()).add(file["source"])
+    return {name: ", ".join(sorted(names)) for name, names in sources.items()}
+
+def find_sharepoint_documents(names, token, drive_id):
+    """Return the names that exist in the Eval Benchmark folder, looked up 20 per Graph $batch call."""
+    from utils.sharepoint import get_file_items
+
+    items = get_file_items(token, drive_id, sorted(names))
+    return {name for name, item in items.items() if item}
+
+def import_questions(stream, fmt, files, submitted_by="Unknown", skip_invalid=False, dry_run=False,
+                     token=None, drive_id=None):
+    """Stream, validate and store questions from a CSV or JSONL file in a single write.
+
+    files are catalog entries used to resolve referenced documents. When token and
+    drive_id are given, documents the catalog does not know (e.g. because it is
+    stale) are looked up in SharePoint in batched requests. By default nothing is
+    stored if any row is invalid; with skip_invalid the valid rows are.
+    Returns a report with "rows", "imported", "error_count", "errors" (first
+    MAX_REPORTED_ERRORS as (row number, message)), "unresolved_documents" and "stored".
+    """
+    file_sources = get_file_sources(files)
+    today = datetime.date.today().isoformat()
+    report = {"rows": 0, "imported": 0, "error_count": 0, "errors": [], "unresolved_documents": [], "stored": False}
+    unresolved = set()
+    entries = []
+
+    for row_number, row in iter_import_rows(stream, fmt):
+        report["rows"] += 1
+        entry, error = parse_question_row(row, file_sources, submitted_by, today)
+        if error:
+            report["error_count"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append((row_number, error))
+            continue
+        unresolved.update(doc["name"] for doc in entry["Reference Documents"] if doc["source"] == "Unknown")
+        entries.append(entry)
+
+    if unresolved and token and drive_id:
+        try:
+            found = find_sharepoint_documents(unresolved, token, drive_id)
+        except Exception:
+            found = set()
+        for entry in entries:
+            for document in entry["Reference Documents"]:
+                if document["source"] == "Unknown" and document["name"] in found:
+                    document["source"] = "SharePoint"
+        unresolved -= found
+
+    report["unresolved_documents"] = sorted(unresolved)
+    if dry_run or not entries or (report["error_count"] and not skip_invalid):
+        return report
+
+    if append_questions(entries) is not None:
+        report["imported"] = len(entries)
+        report["stored"] = True
+    return report
+
+def _sharepoint_location():
+    """Return (token, drive ID) from the app's Azure credentials, or (None, None)."""
+    from utils.sharepoint import get_document_drive_id, get_graph_token, get_site_id
+
+    try:
+        token = get_graph_token()
+        site_id = get_site_id(token)
+        drive_id = get_document_drive_id(token, site_id) if site_id else None
+    except Exception:
+        return None, None
+    return (token, drive_id) if drive_id else (None, None)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.bulk_import",
+        description="Import ground truth questions from a CSV or JSONL file in a single write."
+    )
+    parser.add_argument("path", help="CSV or JSONL file to import")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="input format (default: from the file extension)")
+    parser.add_argument("--submitted-by", default="Bulk Import", help="submitter for rows without \"Submitted By\"")
+    parser.add_argument("--skip-invalid", action="store_true", help="store the valid rows even if some rows are invalid")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, do not store anything")
+    parser.add_argument("--no-sharepoint", action="store_true", help="resolve documents against S3 only")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name, use --format")
+
+    from utils.catalog import get_catalog_files
+
+    token, drive_id = (None, None) if args.no_sharepoint else _sharepoint_location()
+    files = get_catalog_files(token, drive_id, force=True)
+    with open(args.path, "rb") as stream:
+        report = import_questions(stream, fmt, files, args.submitted_by, args.skip_invalid, args.dry_run,
+                                  token=token, drive_id=drive_id)
+
+    for row_number, error in report["errors"]:
+        print(f"Row {row_number}: {error}", file=sys.stderr)
+    if report["error_count"] > len(report["errors"]):
+        print(f"... and {report['error_count'] - len(report['errors'])} more invalid rows", file=sys.stderr)
+    if report["unresolved_documents"]:
+        print(f"{len(report['unresolved_documents'])} referenced documents are not in the file catalog: "
+              + ", ".join(report["unresolved_documents"]), file=sys.stderr)
+
+    print(f"Read {report['rows']} rows, {report['error_count']} invalid, {report['imported']} imported.")
+    if report["stored"]:
+        from utils.export import export_questions_parquet
+        export_questions_parquet()
+    if report["stored"] or (args.dry_run and not report["error_count"]):
+        return 0
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import datetime
+import hashlib
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from utils.s3 import iter_files, read_json_from_s3, update_json_in_s3
+from utils.sharepoint import get_drive_delta, get_eval_benchmark_folder_id
+
+CATALOG_TTL = 60  # seconds between refreshes of each backend
+CATALOG_DEADLINE = 5.0  # seconds a page waits for a backend before serving its cached files
+CONTENT_INDEX_FILE = "content_index.json"  # SHA-256 -> stored file, kept in json-db/
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Process-wide file catalog shared by every session. SharePoint is kept current
+# through Graph delta queries (only changes are fetched after the first sync),
+# S3 through the last listing plus uploads made by this process.
+_catalog = {
+    "drive_id": None,
+    "folder_id": None,
+    "delta_link": None,
+    "sharepoint": {},  # item ID -> catalog entry
+    "sharepoint_checked_at": 0.0,
+    "s3": {},  # file name -> catalog entry
+    "s3_checked_at": 0.0
+}
+_catalog_lock = threading.Lock()
+
+# Backend refreshes run here so SharePoint and S3 are listed concurrently and a
+# slow backend can finish after the page has rendered
+_catalog_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="catalog")
+_refreshes = {}  # backend -> future of the refresh in flight
+
+def _sharepoint_entry(item):
+    """Convert a Graph driveItem into a catalog entry."""
+    return {
+        "name": item["name"],
+        "source": "SharePoint",
+        "lastModified": item.get("lastModifiedDateTime", ""),
+        "createdBy": item.get("createdBy", {}).get("user", {}).get("displayName", "Unknown"),
+        "size": item.get("size")
+    }
+
+def _s3_entry(file_name, last_modified=None, size=None, etag=None):
+    """Build a catalog entry for an S3 object."""
+    return {
+        "name": file_name,
+        "source": "S3",
+        "lastModified": last_modified or datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "createdBy": "Unknown",
+        "size": size,
+        "etag": etag
+    }
+
+def _sync_sharepoint(token, drive_id):
+    """Apply Graph delta changes for the Eval Benchmark folder to the catalog.
+
+    Runs on the catalog executor; the new state is built aside and swapped in under the lock.
+    """
+    started = time.time()
+    with _catalog_lock:
+        state = {key: _catalog[key] for key in ("drive_id", "folder_id", "delta_link", "sharepoint")}
+    if drive_id != state["drive_id"]:
+        state.update({"drive_id": drive_id, "folder_id": None, "delta_link": None, "sharepoint": {}})
+
+    folder_id = get_eval_benchmark_folder_id(token, drive_id)
+    if not folder_id:
+        return False
+    if folder_id != state["folder_id"]:
+        state.update({"folder_id": folder_id, "delta_link": None, "sharepoint": {}})
+
+    changes, delta_link = get_drive_delta(token, drive_id, state["delta_link"])
+    if changes is None:
+        # Delta link expired, start over with a full enumeration
+        changes, delta_link = get_drive_delta(token, drive_id)
+        items = {}
+    else:
+        items = dict(state["sharepoint"]) if state["delta_link"] else {}
+
+    for item in changes or []:
+        in_folder = item.get("parentReference", {}).get("id") == folder_id
+        if "deleted" in item or not in_folder or "folder" in item:
+            items.pop(item["id"], None)
+        elif item.get("name"):
+            items[item["id"]] = _sharepoint_entry(item)
+
+    with _catalog_lock:
+        _catalog.update({
+            "drive_id": drive_id,
+            "folder_id": folder_id,
+            "delta_link": delta_link,
+            "sharepoint": items,
+            "sharepoint_checked_at": started
+        })
+    return True
+
+def _sync_s3():
+    """Replace the S3 part of the catalog with a fresh listing.
+
+    The listing is streamed page by page; the previous catalog is kept if it fails part way.
+    Files recorded by this process after the listing started are kept.
+    """
+    started = time.time()
+    files = {}
+    for entry in iter_files():
+        files[entry["name"]] = _s3_entry(entry["name"], entry["lastModified"], entry["size"], entry["etag"])
+
+    with _catalog_lock:
+        for name, entry in _catalog["s3"].items():
+            if entry.get("uploadedAt", 0) >= started:
+                files.setdefault(name, entry)
+        _catalog.update({"s3": files, "s3_checked_at": started})
+    return True
+
+def _refresh_in_background(backend, sync, *args):
+    """Start a backend refresh unless one is already running. Returns its future."""
+    with _catalog_lock:
+        future = _refreshes.get(backend)
+        if future is None or future.done():
+            future = _catalog_executor.submit(sync, *args)
+            _refreshes[backend] = future
+        return future
+
+def get_catalog_snapshot(token=None, drive_id=None, force=False, deadline=CATALOG_DEADLINE):
+    """Return {"files": [...], "stale": [...]} from SharePoint and S3.
+
+    Backends due for a refresh (once per CATALOG_TTL, or when force is set) are
+    refreshed concurrently. A backend that does not finish within deadline seconds,
+    or fails, contributes its last known files and is listed in "stale"; a slow
+    refresh keeps running and updates the catalog when it completes.
+    """
+    now = time.time()
+    with _catalog_lock:
+        sharepoint_due = bool(token and drive_id) and (
+            force or now - _catalog["sharepoint_checked_at"] >= CATALOG_TTL or drive_id != _catalog["drive_id"]
+        )
+        s3_due = force or now - _catalog["s3_checked_at"] >= CATALOG_TTL
+
+    futures = {}
+    if sharepoint_due:
+        futures["SharePoint"] = _refresh_in_background("SharePoint", _sync_sharepoint, token, drive_id)
+    if s3_due:
+        futures["S3"] = _refresh_in_background("S3", _sync_s3)
+
+    if futures:
+        wait(list(futures.values()), timeout=deadline)
+
+    stale = []
+    for backend, future in futures.items():
+        if not future.done() or future.exception() is not None or not future.result():
+            stale.append(backend)
+
+    with _catalog_lock:
+        files = list(_catalog["sharepoint"].values()) if token and drive_id else []
+        files += list(_catalog["s3"].values())
+    return {"files": files, "stale": stale}
+
+def get_catalog_files(token=None, drive_id=None, force=False):
+    """Return all catalog entries from SharePoint and S3 (see get_catalog_snapshot)."""
+    return get_catalog_snapshot(token, drive_id, force)["files"]
+
+def record_upload(file_name, source):
+    """Add a file uploaded by this process to the catalog without waiting for a refresh."""
+    with _catalog_lock:
+        if source == "S3":
+            _catalog["s3"][file_name] = {**_s3_entry(file_name), "uploadedAt": time.time()}
+        elif source == "SharePoint":
+            # Picked up with full metadata on the next delta sync
+            _catalog["sharepoint_checked_at"] = 0.0
+
+def invalidate_catalog():
+    """Force both backends to refresh on the next read."""
+    with _catalog_lock:
+        _catalog["sharepoint_checked_at"] = 0.0
+        _catalog["s3_checked_at"] = 0.0
+
+def _next_free_filename(original_filename, taken_filenames):
+    """Return original_filename, or its first "copy(n)" variant not in taken_filenames."""
+    if original_filename not in taken_filenames:
+        return original_filename
+
+    name_parts = original_filename.rsplit('.', 1)
+    base_name = name_parts[0]
+    extension = f".{name_parts[1]}" if len(name_parts) > 1 else ""
+
+    counter = 1
+    new_filename = original_filename
+    while new_filename in taken_filenames:
+        new_filename = f"{base_name} copy({counter}){extension}"
+        counter += 1
+    return new_filename
+
+def assign_unique_filenames(original_filenames, existing_filenames):
+    """Return a name for each file that is not in existing_filenames.
+
+    Names assigned earlier in the batch are reserved, so two files with the same
+    name in one upload do not collide.
+    """
+    taken_filenames = set(existing_filenames)
+    unique_filenames = []
+    for original_filename in original_filenames:
+        new_filename = _next_free_filename(original_filename, taken_filenames)
+        taken_filenames.add(new_filename)
+        unique_filenames.append(new_filename)
+    return unique_filenames
+
+def hash_content(data, chunk_size=HASH_CHUNK_SIZE):
+    """Return the SHA-256 hex digest of bytes or a readable file object, read in chunks."""
+    digest = hashlib.sha256()
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data)
+        for start in range(0, len(view), chunk_size):
+            digest.update(view[start:start + chunk_size])
+        return digest.hexdigest()
+
+    position = data.tell()
+    data.seek(0)
+    for chunk in iter(lambda: data.read(chunk_size), b""):
+        digest.update(chunk)
+    data.seek(position)
+    return digest.hexdigest()
+
+def get_content_index():
+    """Return {SHA-256: {"name": ..., "size": ...}} for stored files."""
+    index = read_json_from_s3(CONTENT_INDEX_FILE)
+    return index if isinstance(index, dict) else {}
+
+def find_stored_copy(sha256, existing_filenames, content_index=None):
+    """Return the name of a stored file with the same content, or None.
+
+    Index entries whose file is no longer in the catalog are ignored.
+    """
+    if content_index is None:
+        content_index = get_content_index()
+    entry = content_index.get(sha256)
+    if entry and entry.get("name") in existing_filenames:
+        return entry["name"]
+    return None
+
+def record_content_hashes(entries):
+    """Add {SHA-256: {"name": ..., "size": ...}} entries to the content index in one write.
+
+    The latest upload wins: content is only uploaded again when find_stored_copy
+    found no live copy, so an existing entry for the same hash points at a file
+    that has since been deleted.
+    """
+    if not entries:
+        return True
+
+    def add_entries(index):
+        index = index if isinstance(index, dict) else {}
+        for sha256, entry in entries.items():
+            index[sha256] = entry
+        return index
+
+    return update_json_in_s3(CONTENT_INDEX_FILE, add_entries) is not None
@@ -0,0 +1,269 @@
+import datetime
+import hashlib
+import io
+import json
+import logging
+import sys
+import threading
+import time
+import urllib.parse
+
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.index import question_id
+from utils.s3 import BUCKET_NAME, S3_FOLDER, _read_json_with_etag, get_s3_client, update_json_in_s3, upload_bytes
+from utils.store import load_questions, get_store_version
+
+# Columnar copy of the question store for eval harnesses, written next to the JSON as
+# Hive-style partitions (json-db/parquet/questions/agent_name=<agent>/<fingerprint>.parquet).
+# Only partitions whose questions changed are rewritten. Without pyarrow (see
+# requirements.txt) exporting is a no-op and a warning is logged once. Readers should list files through PARQUET_MANIFEST, which always
+# points at a complete set of partitions. Replaced files stay listed under "retired" and
+# are only deleted PARQUET_RETIRE_GRACE seconds later, so a reader holding an older
+# manifest can still fetch them.
+PARQUET_PREFIX = f"{S3_FOLDER}parquet/questions/"
+PARQUET_MANIFEST = "parquet_manifest.json"  # agent -> {"key", "fingerprint", "rows", "retired"}, kept in json-db/
+PARQUET_RETIRE_GRACE = 600  # seconds
+PARQUET_COMPRESSION = "zstd"
+EMPTY_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+logger = logging.getLogger(__name__)
+
+_export_state = {"version": None, "warned": False}
+# Question ID -> digest of its content; questions never change once stored
+_digest_cache = {}
+_export_lock = threading.Lock()
+_export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+_pending_export = {"future": None}
+_pending_lock = threading.Lock()
+
+def _import_pyarrow():
+    """Return (pyarrow, pyarrow.parquet), or (None, None) when pyarrow is not installed."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        if not _export_state["warned"]:
+            _export_state["warned"] = True
+            logger.warning("pyarrow is not installed; the Parquet export of the question store is disabled.")
+        return None, None
+    return pa, pq
+
+def parquet_export_available():
+    """Return True when pyarrow is installed."""
+    return _import_pyarrow()[0] is not None
+
+def _schema(pa):
+    """Arrow schema of an exported partition; the agent name is carried by the partition path."""
+    return pa.schema([
+        ("id", pa.string()),
+        ("question", pa.string()),
+        ("ideal_answer", pa.string()),
+        ("tags", pa.list_(pa.string())),
+        ("reference_documents", pa.list_(pa.struct([
+            ("name", pa.string()),
+            ("pages", pa.string()),
+            ("source", pa.string())
+        ]))),
+        ("created_on", pa.date32()),
+        ("submitted_by", pa.string())
+    ])
+
+def _parse_date(value):
+    """Return a date from a "%Y-%m-%d" string, or None."""
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+def _partition_rows(questions):
+    """Group questions by agent name as {agent: [(question ID, question)]} in store order."""
+    partitions = {}
+    for position, question in enumerate(questions):
+        agent = str(question.get("Agent Name") or "").strip()
+        partitions.setdefault(agent, []).append((question_id(question, position), question))
+    return partitions
+
+def _question_digest(qid, question):
+    """Return the content digest of a question, serialized only the first time it is seen."""
+    digest = _digest_cache.get(qid)
+    if digest is None:
+        digest = hashlib.sha256(json.dumps(question, sort_keys=True).encode("utf-8")).digest()
+        _digest_cache[qid] = digest
+    return digest
+
+def _fingerprint(rows):
+    """Return a digest that changes whenever any question in a partition changes."""
+    digest = hashlib.sha256()
+    for qid, question in rows:
+        digest.update(qid.encode("utf-8"))
+        digest.update(_question_digest(qid, question))
+    return digest.hexdigest()
+
+def _partition_key(agent, fingerprint):
+    """Return the S3 key of a partition file; content-addressed so concurrent exports agree."""
+    value = urllib.parse.quote(agent, safe="") if agent else EMPTY_PARTITION
+    return f"{PARQUET_PREFIX}agent_name={value}/{fingerprint[:32]}.parquet"
+
+def _partition_table(pa, rows):
+    """Build the Arrow table for one partition."""
+    columns = {
+        "id": [qid for qid, _ in rows],
+        "question": [q.get("Question", "") for _, q in rows],
+        "ideal_answer": [q.get("Ideal Answer", "") for _, q in rows],
+        "tags": [[str(tag) for tag in q.get("Tags") or []] for _, q in rows],
+        "reference_documents": [[
+            {"name": doc.get("name", ""), "pages": str(doc.get("pages", "")), "source": doc.get("source", "Unknown")}
+            for doc in q.get("Reference Documents") or [] if isinstance(doc, dict)
+        ] for _, q in rows],
+        "created_on": [_parse_date(q.get("Created On", "")) for _, q in rows],
+        "submitted_by": [q.get("Submitted By", "Unknown") for _, q in rows]
+    }
+    return pa.table(columns, schema=_schema(pa))
+
+def get_parquet_manifest():
+    """Return {agent: {"key": ..., "fingerprint": ..., "rows": ...}} for the current export.
+
+    Read past the JSON cache, so it never points at files that were deleted since.
+    """
+    try:
+        manifest, _ = _read_json_with_etag(PARQUET_MANIFEST)
+    except Exception:
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+def _delete_keys(keys):
+    """Delete partition files, 1,000 per request; failures leave the files behind."""
+    for start in range(0, len(keys), 1000):
+        try:
+            get_s3_client().delete_objects(
+                Bucket=BUCKET_NAME,
+                Delete={"Objects": [{"Key": key} for key in keys[start:start + 1000]], "Quiet": True}
+            )
+        except Exception:
+            pass
+
+def export_questions_parquet(force=False):
+    """Write changed agent partitions of the question store to Parquet.
+
+    Unchanged partitions (same fingerprint as in the manifest) are skipped, so an
+    export after a submission rewrites only that agent's file. Returns
+    {"written": n, "unchanged": n, "deleted": n}, or None when pyarrow is not
+    installed, nothing changed since the last export, or a write failed.
+    """
+    pa, pq = _import_pyarrow()
+    if pa is None:
+        return None
+
+    with _export_lock:
+        version = get_store_version()
+        if not force and _export_state["version"] == version:
+            return None
+
+        partitions = _partition_rows(load_questions())
+        manifest = get_parquet_manifest()
+        exported = {}
+        uploaded = set()
+        for agent, rows in partitions.items():
+            fingerprint = _fingerprint(rows)
+            entry = manifest.get(agent)
+            if entry and entry.get("fingerprint") == fingerprint:
+                exported[agent] = entry
+                continue
+
+            buffer = io.BytesIO()
+            pq.write_table(_partition_table(pa, rows), buffer, compression=PARQUET_COMPRESSION)
+            key = _partition_key(agent, fingerprint)
+            if not upload_bytes(buffer.getvalue(), key):
+                return None
+            exported[agent] = {"key": key, "fingerprint": fingerprint, "rows": len(rows)}
+            uploaded.add(key)
+
+        deletable = []
+
+        def merge(current):
+            current = current if isinstance(current, dict) else {}
+            now = time.time()
+            for agent, entry in exported.items():
+                previous = current.get(agent) or {}
+                # The store is append-only, so a partition with fewer rows comes from an
+                # export that saw an older store and must not replace a newer one
+                if entry["rows"] < previous.get("rows", 0):
+                    continue
+                retired = list(previous.get("retired", []))
+                if previous.get("key") and previous["key"] != entry["key"]:
+                    retired.append({"key": previous["key"], "retired_at": now})
+                current[agent] = {"key": entry["key"], "fingerprint": entry["fingerprint"], "rows": entry["rows"]}
+                if retired:
+                    current[agent]["retired"] = retired
+
+            # Drop retired files past the grace period; this export's uploads that
+            # lost the merge were never listed, so they can go right away
+            expired = set(uploaded)
+            referenced = set()
+            for entry in current.values():
+                retired = entry.pop("retired", [])
+                kept = [item for item in retired if now - item.get("retired_at", 0) < PARQUET_RETIRE_GRACE]
+                expired.update(item["key"] for item in retired if item not in kept)
+                referenced.add(entry["key"])
+                referenced.update(item["key"] for item in kept)
+                if kept:
+                    entry["retired"] = kept
+            deletable[:] = sorted(expired - referenced)
+            return current
+
+        updated = update_json_in_s3(PARQUET_MANIFEST, merge)
+        if updated is None:
+            return None
+
+        # The manifest no longer points at these files
+        _delete_keys(deletable)
+
+        _export_state["version"] = version
+        return {"written": len(uploaded), "unchanged": len(exported) - len(uploaded), "deleted": len(deletable)}
+
+def schedule_parquet_export():
+    """Export in the background after the store changed; calls made while one is queued are coalesced.
+
+    Runs without a Streamlit script context, so the export itself never calls st.*.
+    """
+    if not parquet_export_available():
+        return None
+    with _pending_lock:
+        future = _pending_export["future"]
+        if future is None or future.running() or future.done():
+            future = _export_executor.submit(export_questions_parquet)
+            _pending_export["future"] = future
+        return future
+
+def read_questions_parquet(columns=None, agents=None):
+    """Read the exported questions as an Arrow table, loading only the given columns and agents.
+
+    For eval harnesses; requires pyarrow. Returns None when it is not installed.
+    """
+    pa, pq = _import_pyarrow()
+    if pa is None:
+        return None
+    if columns is not None:
+        columns = [column for column in columns if column != "agent_name"]
+    tables = []
+    for agent, entry in sorted(get_parquet_manifest().items()):
+        if agents is not None and agent not in agents:
+            continue
+        response = get_s3_client().get_object(Bucket=BUCKET_NAME, Key=entry["key"])
+        table = pq.read_table(io.BytesIO(response["Body"].read()), columns=columns)
+        tables.append(table.append_column("agent_name", pa.array([agent] * table.num_rows, pa.string())))
+    if not tables:
+        schema = _schema(pa).append(pa.field("agent_name", pa.string()))
+        return schema.empty_table().select((columns or schema.names[:-1]) + ["agent_name"])
+    return pa.concat_tables(tables)
+
+if __name__ == "__main__":
+    if not parquet_export_available():
+        print("pyarrow is not installed; install it to export Parquet.", file=sys.stderr)
+        sys.exit(1)
+    result = export_questions_parquet(force=True)
+    if result is None:
+        print("Export failed.", file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote {result['written']} partitions, {result['unchanged']} unchanged, {result['deleted']} deleted.")
@@ -0,0 +1,97 @@
+import random
+import time
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, NewConnectionError
+
+GRAPH_POOL_SIZE = 32  # connections kept alive per host, roughly one per concurrent session
+GRAPH_TIMEOUT = (5, 60)  # (connect, read) seconds
+GRAPH_UPLOAD_TIMEOUT = (5, 300)
+GRAPH_MAX_RETRIES = 4
+GRAPH_BACKOFF_BASE = 0.5  # seconds, doubled on every retry
+GRAPH_BACKOFF_MAX = 30.0
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+# Non-idempotent requests (POST) are only retried when Graph cannot have acted on
+# them: throttled or unavailable responses and connections that never opened.
+# A retried create that did succeed would otherwise add e.g. "Eval Benchmark 1".
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+UNSAFE_RETRY_STATUS_CODES = (429, 503)
+
+def _is_connect_error(error):
+    """Return True if a request failed before the connection was established."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+class GraphClient:
+    """Shared HTTP client for Microsoft Graph and the token endpoint.
+
+    Keeps TLS connections alive in a pooled requests.Session, applies a default
+    timeout to every call and retries throttled (429/503) and transient failures,
+    honoring Retry-After and otherwise backing off exponentially with jitter.
+    """
+
+    def __init__(self, pool_size=GRAPH_POOL_SIZE, timeout=GRAPH_TIMEOUT, max_retries=GRAPH_MAX_RETRIES):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt):
+        """Return a jittered exponential backoff delay for a retry attempt."""
+        delay = min(GRAPH_BACKOFF_MAX, GRAPH_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    def _retry_delay(self, response, attempt):
+        """Return the delay requested by Retry-After, or the backoff delay."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(GRAPH_BACKOFF_MAX, float(retry_after))
+            except ValueError:
+                pass
+        return self._backoff(attempt)
+
+    def request(self, method, url, **kwargs):
+        """Send a request, retrying throttled and transient failures.
+
+        Returns the last response; connection errors are raised once retries are exhausted.
+        POST is retried only on 429/503 and connect errors (see IDEMPOTENT_METHODS).
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_status_codes = RETRY_STATUS_CODES if idempotent else UNSAFE_RETRY_STATUS_CODES
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries or not (idempotent or _is_connect_error(e)):
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code not in retry_status_codes or attempt >= self.max_retries:
+                return response
+            time.sleep(self._retry_delay(response, attempt))
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+graph_client = GraphClient()
@@ -0,0 +1,92 @@
+import bisect
+
+from collections import defaultdict
+
+def question_id(question, position):
+    """Return a stable ID for a question; legacy entries without "id" use their snapshot position."""
+    return question.get("id") or f"legacy-{position}"
+
+def _question_keys(question):
+    """Return the (field, value) pairs a question is indexed under."""
+    keys = []
+    for tag in question.get("Tags") or []:
+        if tag:
+            keys.append(("tags", tag))
+    for doc in question.get("Reference Documents") or []:
+        if isinstance(doc, dict) and doc.get("name"):
+            keys.append(("documents", doc["name"]))
+    agent = question.get("Agent Name")
+    if agent:
+        keys.append(("agents", agent))
+    submitter = question.get("Submitted By")
+    if submitter:
+        keys.append(("submitters", submitter))
+    return keys
+
+class QuestionIndex:
+    """Inverted index of tag / document name / agent name / submitter -> question IDs.
+
+    Built once from the question store and updated in place on every submit, so
+    distinct values and counts do not require a rescan of the question list.
+    """
+
+    FIELDS = ("tags", "documents", "agents", "submitters")
+
+    def __init__(self, questions=()):
+        self.questions = {}
+        self._order = {}
+        self._postings = {field: defaultdict(set) for field in self.FIELDS}
+        self._sorted = {field: [] for field in self.FIELDS}
+        for position, question in enumerate(questions):
+            self.add(question, position)
+
+    def add(self, question, position=None):
+        """Index one question. Returns its question ID."""
+        qid = question_id(question, len(self.questions) if position is None else position)
+        self.questions[qid] = question
+        self._order.setdefault(qid, len(self._order))
+        for field, value in _question_keys(question):
+            postings = self._postings[field]
+            if value not in postings:
+                bisect.insort(self._sorted[field], value)
+            postings[value].add(qid)
+        return qid
+
+    def values(self, field):
+        """Return the sorted distinct values of a field."""
+        return list(self._sorted[field])
+
+    def counts(self, field):
+        """Return {value: number of questions} for a field."""
+        return {value: len(ids) for value, ids in self._postings[field].items()}
+
+    def ids(self, field, value):
+        """Return the IDs of questions indexed under a value."""
+        return set(self._postings[field].get(value, ()))
+
+    def tags(self):
+        return self.values("tags")
+
+    def documents(self):
+        return self.values("documents")
+
+    def agents(self):
+        return self.values("agents")
+
+    def submitters(self):
+        return self.values("submitters")
+
+    def filter(self, tags=None, documents=None, agents=None, submitters=None):
+        """Return question IDs matching all given filters (any value within a filter), in store order."""
+        selected = None
+        filters = (("tags", tags), ("documents", documents), ("agents", agents), ("submitters", submitters))
+        for field, wanted in filters:
+            if not wanted:
+                continue
+            matches = set()
+            for value in wanted:
+                matches |= self._postings[field].get(value, set())
+            selected = matches if selected is None else selected & matches
+        if selected is None:
+            return list(self.questions)
+        return sorted(selected, key=self._order.__getitem__)
@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+
+from utils.s3 import _read_json_with_etag, update_json_in_s3
+
+RATE_LIMIT_FILE = "rate_limits.json"  # shared failed-attempt counts, kept in json-db/
+
+logger = logging.getLogger(__name__)
+
+class MemoryRateLimitBackend:
+    """Failed attempts per user, kept in this process.
+
+    Entries are ordered by their last failure, so expired ones are always at the
+    front and are dropped in O(1) amortized time instead of sweeping every user.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._entries = OrderedDict()  # username -> {"count": ..., "timestamp": ...}
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        while self._entries:
+            username, entry = next(iter(self._entries.items()))
+            if now - entry["timestamp"] < self.window:
+                break
+            self._entries.popitem(last=False)
+
+    def get(self, username, now):
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(username)
+            return dict(entry) if entry else None
+
+    def record_failure(self, username, now):
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.pop(username, {"count": 0})
+            self._entries[username] = {"count": entry["count"] + 1, "timestamp": now}
+
+class S3RateLimitBackend:
+    """Failed attempts per user, shared by all replicas through one S3 object.
+
+    Failures are recorded with conditional writes (update_json_in_s3), so
+    concurrent replicas merge their counts instead of overwriting each other.
+    Reads bypass the shared JSON cache so a block takes effect on every replica
+    as soon as the failure that triggers it is written.
+    """
+
+    def __init__(self, window, file_name=RATE_LIMIT_FILE):
+        self.window = window
+        self.file_name = file_name
+
+    def get(self, username, now):
+        data, _ = _read_json_with_etag(self.file_name)
+        entry = data.get(username) if isinstance(data, dict) else None
+        if entry and now - entry.get("timestamp", 0) < self.window:
+            return dict(entry)
+        return None
+
+    def record_failure(self, username, now):
+        def add_failure(data):
+            data = data if isinstance(data, dict) else {}
+            # Only users with recent failures are stored, so pruning here stays small
+            data = {user: entry for user, entry in data.items() if now - entry.get("timestamp", 0) < self.window}
+            entry = data.get(username, {"count": 0})
+            data[username] = {"count": entry["count"] + 1, "timestamp": now}
+            return data
+
+        update_json_in_s3(self.file_name, add_failure)
+
+RATE_LIMIT_BACKENDS = {
+    "memory": MemoryRateLimitBackend,
+    "s3": S3RateLimitBackend
+}
+
+class RateLimiter:
+    """Blocks a user after max_attempts failures until window seconds after the last one."""
+
+    def __init__(self, max_attempts, window, backend="memory"):
+        self.max_attempts = max_attempts
+        self.window = window
+        if isinstance(backend, str):
+            name = backend.strip().lower()
+            if name not in RATE_LIMIT_BACKENDS:
+                logger.warning("Unknown rate limit backend %r, using \"memory\" (expected one of %s).",
+                               backend, ", ".join(RATE_LIMIT_BACKENDS))
+                name = "memory"
+            backend = RATE_LIMIT_BACKENDS[name](window)
+        self.backend = backend
+
+    def check(self, username):
+        """Return (allowed, seconds until the block ends)."""
+        now = time.time()
+        entry = self.backend.get(username, now)
+        if entry and entry["count"] >= self.max_attempts:
+            return False, entry["timestamp"] + self.window - now
+        return True, 0
+
+    def record_failure(self, username):
+        self.backend.record_failure(username, time.time())
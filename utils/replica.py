@@ -0,0 +1,188 @@
+import json
+import sqlite3
+import threading
+
+import streamlit as st
+
+from utils.index import question_id
+from utils.store import load_questions, get_store_version
+
+# Optional local SQLite mirror of the question store. Enabled by setting
+# SQLITE_REPLICA_PATH under [storage] in secrets (":memory:" works for a single process).
+REPLICA_PATH = st.secrets.get("storage", {}).get("SQLITE_REPLICA_PATH")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    question TEXT,
+    ideal_answer TEXT,
+    agent TEXT,
+    submitter TEXT,
+    created_on TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_position ON questions (position);
+CREATE INDEX IF NOT EXISTS idx_questions_agent ON questions (agent);
+CREATE INDEX IF NOT EXISTS idx_questions_submitter ON questions (submitter);
+CREATE INDEX IF NOT EXISTS idx_questions_created_on ON questions (created_on);
+CREATE TABLE IF NOT EXISTS question_tags (
+    question_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (question_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_question_tags_tag ON question_tags (tag);
+CREATE TABLE IF NOT EXISTS question_documents (
+    question_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (question_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_question_documents_name ON question_documents (name);
+"""
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5 (
+    id UNINDEXED, question, ideal_answer
+);
+"""
+
+# synced / tail: number of store questions mirrored and the ID of the last one
+_replica = {"connection": None, "fts": False, "version": None, "synced": 0, "tail": None}
+_replica_lock = threading.Lock()
+
+def replica_enabled():
+    """Return True when a SQLite replica path is configured."""
+    return bool(REPLICA_PATH)
+
+def _connect():
+    """Open the replica database and create its schema. Caller holds the lock."""
+    connection = sqlite3.connect(REPLICA_PATH, check_same_thread=False)
+    connection.executescript(_SCHEMA)
+    try:
+        connection.executescript(_FTS_SCHEMA)
+        _replica["fts"] = True
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5, text queries fall back to LIKE
+        _replica["fts"] = False
+    _replica["connection"] = connection
+    return connection
+
+def _sync(connection):
+    """Insert questions the replica does not have yet. Caller holds the lock.
+
+    Questions are never edited or deleted and new ones are appended, so normally
+    only the questions after the last synced one are inserted. When that question
+    moved (other replicas' submissions were merged in ahead of it) every position
+    is refreshed once.
+    """
+    questions = load_questions()
+    synced = _replica["synced"]
+    if synced and synced <= len(questions) and question_id(questions[synced - 1], synced - 1) == _replica["tail"]:
+        start = synced
+        existing = set()
+    else:
+        start = 0
+        existing = {row[0] for row in connection.execute("SELECT id FROM questions")}
+    with connection:
+        for position in range(start, len(questions)):
+            question = questions[position]
+            qid = question_id(question, position)
+            if qid in existing:
+                connection.execute("UPDATE questions SET position = ? WHERE id = ? AND position != ?",
+                                   (position, qid, position))
+                continue
+            inserted = connection.execute(
+                "INSERT OR IGNORE INTO questions (id, position, question, ideal_answer, agent, submitter, created_on, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (qid, position, question.get("Question", ""), question.get("Ideal Answer", ""),
+                 question.get("Agent Name", ""), question.get("Submitted By", "Unknown"),
+                 question.get("Created On", ""), json.dumps(question))
+            ).rowcount
+            if not inserted:
+                # Another process sharing the replica file already added it with its tags and text
+                connection.execute("UPDATE questions SET position = ? WHERE id = ? AND position != ?",
+                                   (position, qid, position))
+                continue
+            connection.executemany(
+                "INSERT OR IGNORE INTO question_tags (question_id, tag) VALUES (?, ?)",
+                [(qid, tag) for tag in question.get("Tags") or [] if tag]
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO question_documents (question_id, name) VALUES (?, ?)",
+                [(qid, doc["name"]) for doc in question.get("Reference Documents") or []
+                 if isinstance(doc, dict) and doc.get("name")]
+            )
+            if _replica["fts"]:
+                connection.execute(
+                    "INSERT INTO questions_fts (id, question, ideal_answer) VALUES (?, ?, ?)",
+                    (qid, question.get("Question", ""), question.get("Ideal Answer", ""))
+                )
+    _replica["synced"] = len(questions)
+    _replica["tail"] = question_id(questions[-1], len(questions) - 1) if questions else None
+
+def _replica_connection():
+    """Return a replica connection synced to the current store version. Caller holds the lock."""
+    connection = _replica["connection"] or _connect()
+    version = get_store_version()
+    if _replica["version"] != version:
+        _sync(connection)
+        _replica["version"] = version
+    return connection
+
+def replica_values(field):
+    """Return [(value, question count)] sorted by value for "tags", "documents", "agents" or "submitters"."""
+    queries = {
+        "tags": "SELECT tag, COUNT(*) FROM question_tags GROUP BY tag ORDER BY tag",
+        "documents": "SELECT name, COUNT(*) FROM question_documents GROUP BY name ORDER BY name",
+        "agents": "SELECT agent, COUNT(*) FROM questions WHERE agent != '' GROUP BY agent ORDER BY agent",
+        "submitters": "SELECT submitter, COUNT(*) FROM questions WHERE submitter != '' GROUP BY submitter ORDER BY submitter"
+    }
+    with _replica_lock:
+        return _replica_connection().execute(queries[field]).fetchall()
+
+def replica_question_ids(tags=None, agents=None, submitters=None, documents=None,
+                         date_from=None, date_to=None, text=None, limit=None, offset=0):
+    """Return IDs of questions matching all given filters, in store order.
+
+    text uses the FTS5 index (best match first) when available.
+    """
+    clauses = []
+    params = []
+    for column, table, values in (("tag", "question_tags", tags), ("name", "question_documents", documents)):
+        if values:
+            placeholders = ", ".join("?" * len(values))
+            clauses.append(f"q.id IN (SELECT question_id FROM {table} WHERE {column} IN ({placeholders}))")
+            params.extend(values)
+    for column, values in (("agent", agents), ("submitter", submitters)):
+        if values:
+            clauses.append(f"q.{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if date_from:
+        clauses.append("q.created_on >= ?")
+        params.append(str(date_from))
+    if date_to:
+        clauses.append("q.created_on <= ?")
+        params.append(str(date_to))
+
+    with _replica_lock:
+        connection = _replica_connection()
+        order_by = "q.position"
+        join = ""
+        if text and _replica["fts"]:
+            terms = " OR ".join(f'"{term}"' for term in text.replace('"', " ").split())
+            if terms:
+                join = "JOIN questions_fts f ON f.id = q.id"
+                clauses.append("questions_fts MATCH ?")
+                params.append(terms)
+                order_by = "bm25(questions_fts)"
+        elif text:
+            clauses.append("(q.question LIKE ? OR q.ideal_answer LIKE ?)")
+            params.extend([f"%{text}%"] * 2)
+
+        sql = f"SELECT q.id FROM questions q {join}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([int(limit), int(offset)])
+        return [row[0] for row in connection.execute(sql, params)]
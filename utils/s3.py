@@ -1,9 +1,12 @@
 import streamlit as st
-import boto3
+import base64
+import hashlib
+import io
 import json
 import os
-
-from botocore.exceptions import ClientError
+import random
+import threading
+import time
 
 
 # Load AWS credentials 
@@ -11,91 +14,284 @@ AWS_ACCESS_KEY = st.secrets["aws"]["AWS_ACCESS_KEY_ID"]
 AWS_SECRET_KEY = st.secrets["aws"]["AWS_SECRET_ACCESS_KEY"]
 AWS_REGION = st.secrets["aws"]["AWS_REGION"]
 BUCKET_NAME = st.secrets["aws"]["S3_BUCKET_NAME"]
+# Optional S3-compatible endpoint (e.g. MinIO or a local stand-in for benchmarks)
+S3_ENDPOINT_URL = st.secrets["aws"].get("S3_ENDPOINT_URL")
 
 S3_FOLDER = "json-db/"
 
-# Initialize S3 client
-try:
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_KEY,
-        region_name=AWS_REGION
-    )
-except Exception:
-    st.error("Error connecting to S3. Please check your credentials.")
+# Uploads above the threshold are split into parts sent in parallel
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+MULTIPART_CONCURRENCY = 8
+
+# boto3 is imported and the client created on first use, so pages that never
+# touch S3 (and the login page until someone signs in) don't pay for it.
+# The client is thread-safe and shared by every session.
+_s3_resources = {}
+_s3_resources_lock = threading.Lock()
+
+def get_s3_client():
+    """Return the shared S3 client, creating it on first use."""
+    client = _s3_resources.get("client")
+    if client is not None:
+        return client
+    with _s3_resources_lock:
+        if "client" not in _s3_resources:
+            import boto3
+            try:
+                _s3_resources["client"] = boto3.client(
+                    "s3",
+                    aws_access_key_id=AWS_ACCESS_KEY,
+                    aws_secret_access_key=AWS_SECRET_KEY,
+                    region_name=AWS_REGION,
+                    endpoint_url=S3_ENDPOINT_URL
+                )
+            except Exception:
+                st.error("Error connecting to S3. Please check your credentials.")
+                raise
+        return _s3_resources["client"]
+
+def get_transfer_config():
+    """Return the shared multipart TransferConfig, creating it on first use."""
+    config = _s3_resources.get("transfer_config")
+    if config is None:
+        from boto3.s3.transfer import TransferConfig
+        config = TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD,
+            multipart_chunksize=MULTIPART_CHUNKSIZE,
+            max_concurrency=MULTIPART_CONCURRENCY,
+            use_threads=True
+        )
+        _s3_resources["transfer_config"] = config
+    return config
+
+def _error_code(error):
+    """Return the S3 error code of a botocore ClientError, or None for other exceptions."""
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code")
+    return None
+
+JSON_CACHE_TTL = 30  # seconds before a cached object is revalidated against S3
+UPDATE_MAX_ATTEMPTS = 5
+UPDATE_BACKOFF_BASE = 0.2  # seconds, doubled on every conflicting attempt
+UPDATE_BACKOFF_MAX = 3.0
+CONFLICT_ERROR_CODES = ("PreconditionFailed", "ConditionalRequestConflict", "412", "409")
+
+# Process-wide cache shared by every Streamlit session: s3_key -> entry
+_json_cache = {}
+_json_cache_lock = threading.Lock()
+
+def _empty_json(file_name):
+    """Return the empty value used when a JSON file cannot be read."""
+    if file_name.endswith("questions.json") or "questions" in file_name:
+        return []
+    return {}
+
+def _copy_json(data):
+    """Return a shallow copy so callers can append/assign without touching the cache."""
+    if isinstance(data, (list, dict)):
+        return data.copy()
+    return data
+
+def invalidate_json_cache(file_name=None):
+    """Drop a cached JSON file (or the whole cache when no file name is given)."""
+    with _json_cache_lock:
+        if file_name is None:
+            _json_cache.clear()
+        else:
+            _json_cache.pop(f"{S3_FOLDER}{file_name}", None)
 
 def read_json_from_s3(file_name):
-    """Read and parse a JSON file from S3."""
+    """Read and parse a JSON file from S3.
+
+    Parsed objects are cached process-wide by key. Once an entry is older than
+    JSON_CACHE_TTL it is revalidated with a conditional GET on its ETag and only
+    re-parsed when the object changed. The returned value is a shallow copy:
+    the top-level container may be modified, nested items must be treated as read-only.
+    """
     s3_key = f"{S3_FOLDER}{file_name}"
+    with _json_cache_lock:
+        cached = _json_cache.get(s3_key)
+
+    if cached and time.time() - cached["checked_at"] < JSON_CACHE_TTL:
+        return _copy_json(cached["data"])
+
+    request = {"Bucket": BUCKET_NAME, "Key": s3_key}
+    if cached:
+        request["IfNoneMatch"] = cached["etag"]
+
     try:
-        response = s3_client.get_object(Bucket=BUCKET_NAME, Key=s3_key)
+        response = get_s3_client().get_object(**request)
         data = json.loads(response["Body"].read().decode("utf-8"))
-        return data
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'NoSuchKey':
-            # File doesn't exist yet, return empty data
-            if file_name.endswith("questions.json") or "questions" in file_name:
-                return []
-            return {}
-        else:
-            if file_name.endswith("questions.json") or "questions" in file_name:
-                return []
-            return {}
-    except Exception:
-        if file_name.endswith("questions.json") or "questions" in file_name:
-            return []
-        return {}
+        with _json_cache_lock:
+            _json_cache[s3_key] = {
+                "etag": response.get("ETag"),
+                "data": data,
+                "checked_at": time.time()
+            }
+        return _copy_json(data)
+    except Exception as e:
+        code = _error_code(e)
+        if cached and code in ("304", "NotModified"):
+            # Unchanged since the last read, keep the parsed copy
+            with _json_cache_lock:
+                cached["checked_at"] = time.time()
+            return _copy_json(cached["data"])
+        if code in ("NoSuchKey", "404"):
+            # The file doesn't exist (yet, or any more), return empty data
+            invalidate_json_cache(file_name)
+            return _empty_json(file_name)
+        if cached:
+            # Transient failure (throttling, network): serve the last known copy
+            # and retry on the next read rather than dropping it
+            return _copy_json(cached["data"])
+        return _empty_json(file_name)
+
+def write_json_to_s3(file_name, data, etag=None):
+    """Write JSON data to an S3 file.
 
-def write_json_to_s3(file_name, data):
-    """Write JSON data to an S3 file."""
+    When an ETag is given the write only succeeds if the object is unchanged since it was read.
+    """
     s3_key = f"{S3_FOLDER}{file_name}"
     try:
-        s3_client.put_object(
-            Bucket=BUCKET_NAME,
-            Key=s3_key,
-            Body=json.dumps(data, indent=4)
-        )
+        _put_json(s3_key, data, etag=etag)
+        invalidate_json_cache(file_name)
         st.success(f"Successfully updated {file_name}!")
         return True
     except Exception:
         st.error(f"Error writing {file_name} to S3")
         return False
 
+def _put_json(s3_key, data, etag=None, create_only=False):
+    """Put a JSON object, optionally conditional on its ETag. Returns the new ETag."""
+    request = {
+        "Bucket": BUCKET_NAME,
+        "Key": s3_key,
+        "Body": json.dumps(data, indent=4)
+    }
+    if etag:
+        request["IfMatch"] = etag
+    elif create_only:
+        request["IfNoneMatch"] = "*"
+    response = get_s3_client().put_object(**request)
+    return response.get("ETag")
+
+def _read_json_with_etag(file_name):
+    """Read a JSON file bypassing the cache. Returns (data, etag); etag is None if the file is missing."""
+    s3_key = f"{S3_FOLDER}{file_name}"
+    try:
+        response = get_s3_client().get_object(Bucket=BUCKET_NAME, Key=s3_key)
+        return json.loads(response["Body"].read().decode("utf-8")), response.get("ETag")
+    except Exception as e:
+        if _error_code(e) in ("NoSuchKey", "404"):
+            return _empty_json(file_name), None
+        raise
+
+def update_json_in_s3(file_name, mutate_fn, max_attempts=UPDATE_MAX_ATTEMPTS):
+    """Read-modify-write a JSON file in S3 without losing concurrent updates.
+
+    mutate_fn receives the current data and returns the new data (or None after
+    mutating in place). The write is conditional on the ETag that was read; on a
+    conflict the file is re-read and mutate_fn re-applied, with jittered backoff.
+    Returns the written data, or None if every attempt failed.
+    """
+    s3_key = f"{S3_FOLDER}{file_name}"
+    for attempt in range(max_attempts):
+        try:
+            data, etag = _read_json_with_etag(file_name)
+            new_data = mutate_fn(data)
+            if new_data is None:
+                new_data = data
+            _put_json(s3_key, new_data, etag=etag, create_only=etag is None)
+            invalidate_json_cache(file_name)
+            return new_data
+        except Exception as e:
+            if _error_code(e) not in CONFLICT_ERROR_CODES:
+                return None
+
+        if attempt == max_attempts - 1:
+            break
+        delay = min(UPDATE_BACKOFF_MAX, UPDATE_BACKOFF_BASE * (2 ** attempt))
+        time.sleep(delay * random.uniform(0.5, 1.0))
+    return None
+
 def upload_file(file_path, target_filename=None, bucket=BUCKET_NAME):
     """Upload a file to an S3 bucket."""
     key = target_filename if target_filename else os.path.basename(file_path)
     
     try:
         with open(file_path, 'rb') as file_data:
-            s3_client.upload_fileobj(file_data, bucket, key)
+            get_s3_client().upload_fileobj(file_data, bucket, key, Config=get_transfer_config())
         return True
     except FileNotFoundError:
         return False
     except Exception:
         return False
 
+def upload_stream(file_obj, target_filename, bucket=BUCKET_NAME, verify_integrity=False):
+    """Upload a readable file object to an S3 bucket without writing it to disk.
+
+    Large objects use parallel multipart parts. With verify_integrity, S3 checks a
+    SHA-256 checksum of every part (Content-MD5 cannot be sent for multipart uploads).
+    """
+    extra_args = {"ChecksumAlgorithm": "SHA256"} if verify_integrity else None
+    try:
+        get_s3_client().upload_fileobj(file_obj, bucket, target_filename, ExtraArgs=extra_args, Config=get_transfer_config())
+        return True
+    except Exception:
+        return False
+
+def upload_bytes(file_bytes, target_filename, bucket=BUCKET_NAME, verify_integrity=False):
+    """Upload in-memory bytes to an S3 bucket.
+
+    Small payloads are sent in a single PUT (with Content-MD5 when verify_integrity
+    is set); larger ones are streamed as a multipart upload.
+    """
+    if len(file_bytes) >= MULTIPART_THRESHOLD:
+        return upload_stream(io.BytesIO(file_bytes), target_filename, bucket, verify_integrity)
+
+    request = {"Bucket": bucket, "Key": target_filename, "Body": file_bytes}
+    if verify_integrity:
+        request["ContentMD5"] = base64.b64encode(hashlib.md5(file_bytes).digest()).decode("ascii")
+    try:
+        get_s3_client().put_object(**request)
+        return True
+    except Exception:
+        return False
+
+def iter_files(prefix="", bucket=BUCKET_NAME):
+    """Yield file entries in an S3 bucket page by page, excluding json-db/ folder files.
+
+    Follows continuation tokens, so listings are not truncated at 1,000 keys.
+    Errors are raised to the caller.
+    """
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            # Skip files in the json-db/ folder
+            if key.startswith(S3_FOLDER) or key.endswith("/"):
+                continue
+            yield {
+                "name": os.path.basename(key),
+                "key": key,
+                "lastModified": obj["LastModified"].isoformat(),
+                "size": obj.get("Size", 0),
+                "etag": obj.get("ETag", "").strip('"')
+            }
+
 def list_files(prefix="", bucket=BUCKET_NAME):
     """List all file names in an S3 bucket, excluding json-db/ folder files."""
     try:
-        response = s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix)
-        
-        if "Contents" in response:
-            files = []
-            for obj in response["Contents"]:
-                key = obj["Key"]
-                # Skip files in the json-db/ folder
-                if not key.startswith(S3_FOLDER):
-                    files.append(os.path.basename(key))
-            return files
-        return []
+        return [entry["name"] for entry in iter_files(prefix, bucket)]
     except Exception:
         return []
 
 def file_exists(file_name, bucket=BUCKET_NAME):
     """Check if a file exists in an S3 bucket."""
     try:
-        s3_client.head_object(Bucket=bucket, Key=file_name)
+        get_s3_client().head_object(Bucket=bucket, Key=file_name)
         return True
-    except ClientError:
+    except Exception:
         return False
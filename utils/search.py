@@ -0,0 +1,65 @@
+import heapq
+import math
+import re
+
+from collections import Counter, defaultdict
+
+from utils.index import question_id
+
+SEARCH_FIELDS = ("Question", "Ideal Answer")
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall(str(text).lower()) if text else []
+
+class SearchIndex:
+    """BM25 full-text index over the "Question" and "Ideal Answer" fields.
+
+    Postings store raw term frequencies, so adding a question only touches its own
+    terms; collection statistics are applied at query time.
+    """
+
+    def __init__(self, questions=()):
+        self._postings = defaultdict(dict)  # term -> {question ID: term frequency}
+        self._lengths = {}
+        self._total_length = 0
+        for position, question in enumerate(questions):
+            self.add(question, position)
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, question, position=None):
+        """Index one question. Returns its question ID."""
+        qid = question_id(question, len(self._lengths) if position is None else position)
+        if qid in self._lengths:
+            return qid
+        tokens = []
+        for field in SEARCH_FIELDS:
+            tokens.extend(tokenize(question.get(field, "")))
+        for term, freq in Counter(tokens).items():
+            self._postings[term][qid] = freq
+        self._lengths[qid] = len(tokens)
+        self._total_length += len(tokens)
+        return qid
+
+    def search(self, query, k=20):
+        """Return the top-k (question ID, score) pairs for a query, best first."""
+        n_docs = len(self._lengths)
+        if not n_docs:
+            return []
+        avg_length = self._total_length / n_docs or 1.0
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for qid, freq in postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[qid] / avg_length)
+                scores[qid] += idf * freq * (BM25_K1 + 1) / (freq + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
@@ -2,14 +2,27 @@ import streamlit as st
 import requests
 import json
 import os
+import threading
+import time
+
+from urllib.parse import quote
+
+from utils.graph import graph_client, GRAPH_UPLOAD_TIMEOUT, GRAPH_BACKOFF_MAX, RETRY_STATUS_CODES
 
 # Const
 GRAPH_API_BASE_URL = "https://graph.microsoft.com/v1.0"
 EVAL_BENCHMARK_PATH = "/Eval Benchmark"
 SHAREPOINT_FOLDER = "/sites/qlytics.sharepoint.com:/sites/AmpliforceHQ"
 
-def get_access_token(tenant_id, client_id, client_secret):
-    """Get OAuth Token from Microsoft"""
+TOKEN_REFRESH_MARGIN = 300  # seconds before expiry at which tokens are refreshed
+SIMPLE_UPLOAD_LIMIT = 4 * 1024 * 1024  # Graph rejects single-request uploads above 4 MB
+UPLOAD_CHUNK_SIZE = 16 * 320 * 1024  # 5 MiB, chunks must be a multiple of 320 KiB
+UPLOAD_CHUNK_RETRIES = 5
+GRAPH_BATCH_LIMIT = 20  # sub-requests per $batch call allowed by Graph
+GRAPH_BATCH_RETRIES = 3
+
+def request_access_token(tenant_id, client_id, client_secret):
+    """Request a new OAuth Token from Microsoft. Returns (token, expires_in) or (None, 0)"""
     token_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
     
     data = {
@@ -18,32 +31,116 @@ def get_access_token(tenant_id, client_id, client_secret):
         "client_secret": client_secret,
         "scope": "https://graph.microsoft.com/.default"
     }
-    response = requests.post(token_url, data=data)
+    response = graph_client.post(token_url, data=data)
     token_json = response.json()
 
     if "access_token" not in token_json:
-        return None
+        return None, 0
+
+    return token_json["access_token"], int(token_json.get("expires_in", 3600))
+
+class TokenProvider:
+    """Process-wide cache of a client-credentials token.
+
+    The token is shared by all sessions and refreshed in a background timer
+    TOKEN_REFRESH_MARGIN seconds before it expires. Refreshes are single-flight:
+    concurrent callers wait for the one request in progress instead of issuing their own.
+    """
+
+    def __init__(self, tenant_id, client_id, client_secret):
+        self._credentials = (tenant_id, client_id, client_secret)
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0.0
+        self._timer = None
+
+    def _is_fresh(self):
+        return self._token is not None and time.time() < self._expires_at - TOKEN_REFRESH_MARGIN
+
+    def _refresh(self):
+        """Fetch a new token unless another thread already did. Caller holds the lock."""
+        if self._is_fresh():
+            return
+        token, expires_in = request_access_token(*self._credentials)
+        if not token:
+            return
+        self._token = token
+        self._expires_at = time.time() + expires_in
+        self._schedule_refresh(expires_in)
+
+    def _schedule_refresh(self, expires_in):
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(1, expires_in - TOKEN_REFRESH_MARGIN), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                self._refresh()
+        except Exception:
+            pass
+
+    def get_token(self):
+        """Returns the current token, fetching a new one only if it is missing or about to expire"""
+        if self._is_fresh():
+            return self._token
+        with self._lock:
+            try:
+                self._refresh()
+            except Exception:
+                pass
+            # A token inside the refresh margin is still valid if the refresh failed
+            if self._token and time.time() < self._expires_at:
+                return self._token
+            return None
+
+_token_providers = {}
+_token_providers_lock = threading.Lock()
+
+def get_token_provider(tenant_id, client_id, client_secret):
+    """Returns the shared token provider for a set of client credentials"""
+    key = (tenant_id, client_id)
+    with _token_providers_lock:
+        provider = _token_providers.get(key)
+        if provider is None:
+            provider = TokenProvider(tenant_id, client_id, client_secret)
+            _token_providers[key] = provider
+        return provider
 
-    return token_json["access_token"]
+def get_access_token(tenant_id, client_id, client_secret):
+    """Get OAuth Token from Microsoft (shared across sessions until shortly before expiry)"""
+    return get_token_provider(tenant_id, client_id, client_secret).get_token()
+
+def get_graph_token():
+    """Get the current OAuth Token using the app's Azure credentials"""
+    azure = st.secrets["azure"]
+    return get_access_token(azure["TENANT_ID"], azure["CLIENT_ID"], azure["CLIENT_SECRET"])
+
+_site_id_cache = {}
 
 def get_site_id(token):
-    """Get SharePoint Site ID"""
-    headers = {"Authorization": f"Bearer {token}"}
+    """Get SharePoint Site ID (resolved once per process)"""
     site_url = f"{GRAPH_API_BASE_URL}/sites/qlytics.sharepoint.com:/sites/AmpliforceHQ"
+    if site_url in _site_id_cache:
+        return _site_id_cache[site_url]
 
-    response = requests.get(site_url, headers=headers)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = graph_client.get(site_url, headers=headers)
     site_info = response.json()
 
     if "id" not in site_info:
         return None
 
+    _site_id_cache[site_url] = site_info["id"]
     return site_info["id"]
 
 def get_document_libraries(token, site_id):
     """Returns a list of document libraries from SharePoint"""
     headers = {"Authorization": f"Bearer {token}"}
     url = f"{GRAPH_API_BASE_URL}/sites/{site_id}/drives"
-    response = requests.get(url, headers=headers)
+    response = graph_client.get(url, headers=headers)
     libraries = response.json()
 
     if "value" not in libraries:
@@ -51,149 +148,346 @@ def get_document_libraries(token, site_id):
 
     return libraries["value"]
 
+def iter_graph_collection(token, url):
+    """Yields the items of a Graph collection page by page, following @odata.nextLink"""
+    headers = {"Authorization": f"Bearer {token}"}
+
+    while url:
+        response = graph_client.get(url, headers=headers)
+        response.raise_for_status()
+        page = response.json()
+        for item in page.get("value", []):
+            yield item
+        url = page.get("@odata.nextLink")
+
+def iter_files_in_eval_benchmark(token, drive_id):
+    """Yields the items in the Eval Benchmark folder page by page"""
+    for attempt in range(2):
+        folder_id = get_eval_benchmark_folder_id(token, drive_id)
+        if not folder_id:
+            return
+
+        url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/items/{folder_id}/children"
+        items = iter_graph_collection(token, url)
+        try:
+            first_item = next(items, None)
+        except requests.HTTPError as e:
+            if attempt == 0 and e.response is not None and e.response.status_code == 404:
+                # Folder was moved or recreated, resolve it again
+                invalidate_sharepoint_location(drive_id=drive_id)
+                continue
+            raise
+
+        if first_item is not None:
+            yield first_item
+            yield from items
+        return
+
 def get_files_in_eval_benchmark(token, drive_id):
     """Returns a list of files in the Eval Benchmark folder"""
-    headers = {"Authorization": f"Bearer {token}"}
-    url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/root:{EVAL_BENCHMARK_PATH}:/children"
-    
     try:
         with st.spinner("Loading files..."):
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code == 200:
-                files = response.json()
-                if "value" in files:
-                    return files["value"]
-                else:
-                    return []
-            else:
-                root_url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/root/children"
-                root_response = requests.get(root_url, headers=headers)
-                
-                if root_response.status_code == 200:
-                    root_items = root_response.json()
-                    
-                    if "value" in root_items:
-                        for item in root_items["value"]:
-                            if item.get("name") == "Eval Benchmark" and "folder" in item:
-                                eval_id = item.get("id")
-                                
-                                eval_url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/items/{eval_id}/children"
-                                eval_response = requests.get(eval_url, headers=headers)
-                                
-                                if eval_response.status_code == 200:
-                                    eval_items = eval_response.json()
-                                    if "value" in eval_items:
-                                        return eval_items["value"]
-        return []
+            return list(iter_files_in_eval_benchmark(token, drive_id))
     except Exception:
         return []
 
+def get_eval_benchmark_folder(token, drive_id):
+    """Returns the Eval Benchmark folder item, or None if it does not exist"""
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/root:{EVAL_BENCHMARK_PATH}"
+
+    try:
+        response = graph_client.get(url, headers=headers)
+        if response.status_code == 200:
+            item = response.json()
+            if "folder" in item:
+                return item
+        return None
+    except Exception:
+        return None
+
+# Resolved SharePoint locations shared across sessions; entries are dropped when Graph returns 404
+_drive_id_cache = {}  # site ID -> document library drive ID
+_folder_id_cache = {}  # drive ID -> Eval Benchmark folder item ID
+
+def get_document_drive_id(token, site_id):
+    """Returns the drive ID of the site's document library (resolved once per process)"""
+    if site_id in _drive_id_cache:
+        return _drive_id_cache[site_id]
+
+    libraries = get_document_libraries(token, site_id)
+    for lib in libraries or []:
+        if "document" in lib["name"].lower():
+            _drive_id_cache[site_id] = lib["id"]
+            return lib["id"]
+    return None
+
+def _find_eval_benchmark_folder_id(token, drive_id, create=False):
+    """Looks up (and optionally creates) the Eval Benchmark folder, returning its item ID"""
+    folder = get_eval_benchmark_folder(token, drive_id)
+    if folder:
+        return folder["id"]
+
+    # Path addressing failed, look the folder up by name in the drive root
+    root_url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/root/children"
+    try:
+        for item in iter_graph_collection(token, root_url):
+            if item.get("name") == "Eval Benchmark" and "folder" in item:
+                return item.get("id")
+    except Exception:
+        return None
+
+    if not create:
+        return None
+
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    create_folder_data = {
+        "name": "Eval Benchmark",
+        "folder": {},
+        "@microsoft.graph.conflictBehavior": "rename"
+    }
+    create_folder_response = graph_client.post(root_url, headers=headers, json=create_folder_data)
+    if create_folder_response.status_code in (200, 201):
+        return create_folder_response.json().get("id")
+    return None
+
+def get_eval_benchmark_folder_id(token, drive_id, create=False):
+    """Returns the item ID of the Eval Benchmark folder (resolved once per process)"""
+    if drive_id in _folder_id_cache:
+        return _folder_id_cache[drive_id]
+
+    folder_id = _find_eval_benchmark_folder_id(token, drive_id, create=create)
+    if folder_id:
+        _folder_id_cache[drive_id] = folder_id
+    return folder_id
+
+def invalidate_sharepoint_location(site_id=None, drive_id=None):
+    """Forgets resolved drive / folder IDs so they are looked up again"""
+    if site_id is not None:
+        _drive_id_cache.pop(site_id, None)
+    if drive_id is not None:
+        _folder_id_cache.pop(drive_id, None)
+
+def get_drive_delta(token, drive_id, delta_link=None):
+    """Returns (changed items, delta link) for a drive since the given delta link.
+
+    Without a delta link the whole drive is enumerated. SharePoint only supports
+    delta on the drive root, so callers filter items by parentReference.
+    Returns (None, None) when the delta link has expired and a full resync is needed.
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    url = delta_link or f"{GRAPH_API_BASE_URL}/drives/{drive_id}/root/delta"
+    changes = []
+
+    while url:
+        response = graph_client.get(url, headers=headers)
+        if response.status_code == 410:
+            return None, None
+        response.raise_for_status()
+        page = response.json()
+        changes.extend(page.get("value", []))
+        url = page.get("@odata.nextLink")
+        if not url:
+            delta_link = page.get("@odata.deltaLink")
+
+    return changes, delta_link
+
 def get_file_item(token, drive_id, file_name):
     """Gets a specific file from the Eval Benchmark folder"""
     headers = {"Authorization": f"Bearer {token}"}
-    url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/root:{EVAL_BENCHMARK_PATH}/{file_name}"
     
     try:
-        response = requests.get(url, headers=headers)
+        folder_id = get_eval_benchmark_folder_id(token, drive_id)
+        if not folder_id:
+            return None
+
+        url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/items/{folder_id}:/{quote(file_name)}"
+        response = graph_client.get(url, headers=headers)
         
         if response.status_code == 200:
             return response.json()
-        
-        files = get_files_in_eval_benchmark(token, drive_id)
-        
-        if files:
-            for file in files:
-                if file.get("name") == file_name:
-                    return file
-        
         return None
     except Exception:
         return None
 
-def upload_to_eval_benchmark(token, site_id, file_name, file_content):
-    """Uploads a file to the Eval Benchmark folder in SharePoint"""
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    libraries = get_document_libraries(token, site_id)
-    if not libraries:
-        return None
+def graph_batch(token, batch_requests):
+    """Sends independent Graph requests through the JSON $batch endpoint.
+
+    Each request is a dict with "method" (default GET), "url" relative to the API
+    version (e.g. "/drives/{id}/items/{id}") and optional "headers" and "body".
+    Requests are sent GRAPH_BATCH_LIMIT per HTTP call; throttled sub-requests are
+    retried after their Retry-After. Returns one {"status", "headers", "body"}
+    dict per request, in order; status is None when the whole batch call failed.
+    """
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    results = [{"status": None, "headers": {}, "body": None} for _ in batch_requests]
+    pending = list(range(len(batch_requests)))
 
-    drive_id = None
-    for lib in libraries:
-        if "document" in lib["name"].lower():  
-            drive_id = lib["id"]
+    for attempt in range(GRAPH_BATCH_RETRIES + 1):
+        throttled = []
+        retry_after = 1.0
+
+        for start in range(0, len(pending), GRAPH_BATCH_LIMIT):
+            chunk = pending[start:start + GRAPH_BATCH_LIMIT]
+            sub_requests = []
+            for index in chunk:
+                request = batch_requests[index]
+                sub_request = {"id": str(index), "method": request.get("method", "GET"), "url": request["url"]}
+                if request.get("headers"):
+                    sub_request["headers"] = request["headers"]
+                if request.get("body") is not None:
+                    sub_request["body"] = request["body"]
+                sub_requests.append(sub_request)
+
+            try:
+                response = graph_client.post(f"{GRAPH_API_BASE_URL}/$batch", headers=headers, json={"requests": sub_requests})
+            except Exception:
+                continue
+            if response.status_code != 200:
+                continue
+
+            for sub_response in response.json().get("responses", []):
+                index = int(sub_response["id"])
+                results[index] = {
+                    "status": sub_response.get("status"),
+                    "headers": sub_response.get("headers", {}),
+                    "body": sub_response.get("body")
+                }
+                if sub_response.get("status") in RETRY_STATUS_CODES:
+                    throttled.append(index)
+                    try:
+                        retry_after = max(retry_after, float(sub_response.get("headers", {}).get("Retry-After", 1)))
+                    except ValueError:
+                        pass
+
+        if not throttled or attempt == GRAPH_BATCH_RETRIES:
             break
+        time.sleep(min(GRAPH_BACKOFF_MAX, retry_after))
+        pending = sorted(throttled)
+
+    return results
+
+def get_file_items(token, drive_id, file_names):
+    """Gets several files from the Eval Benchmark folder in batched requests
 
+    Returns {file name: driveItem or None}.
+    """
+    folder_id = get_eval_benchmark_folder_id(token, drive_id)
+    if not folder_id:
+        return {file_name: None for file_name in file_names}
+
+    batch_requests = [
+        {"url": f"/drives/{drive_id}/items/{folder_id}:/{quote(file_name)}"}
+        for file_name in file_names
+    ]
+    results = graph_batch(token, batch_requests)
+    return {
+        file_name: result["body"] if result["status"] == 200 else None
+        for file_name, result in zip(file_names, results)
+    }
+
+def create_upload_session(token, drive_id, folder_id, file_name):
+    """Creates a resumable upload session for a file in the given folder"""
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/items/{folder_id}:/{quote(file_name)}:/createUploadSession"
+    data = {"item": {"@microsoft.graph.conflictBehavior": "replace"}}
+    return graph_client.post(url, headers=headers, json=data)
+
+def _next_expected_offset(upload_url):
+    """Returns the first byte the upload session still expects, or None if the session is gone"""
+    try:
+        response = graph_client.get(upload_url)
+        if response.status_code != 200:
+            return None
+        ranges = response.json().get("nextExpectedRanges") or ["0-"]
+        return int(ranges[0].split("-")[0])
+    except Exception:
+        return None
+
+def upload_in_chunks(upload_url, file_content, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Uploads file content to an upload session in fixed-size ranges.
+
+    Failed ranges are retried, resuming from the last byte the session acknowledged.
+    The upload URL is pre-authenticated, so no Authorization header is sent.
+    """
+    total = len(file_content)
+    offset = 0
+    failures = 0
+
+    while offset < total:
+        end = min(offset + chunk_size, total)
+        headers = {
+            "Content-Length": str(end - offset),
+            "Content-Range": f"bytes {offset}-{end - 1}/{total}"
+        }
+        try:
+            response = graph_client.put(upload_url, headers=headers, data=file_content[offset:end],
+                                        timeout=GRAPH_UPLOAD_TIMEOUT)
+            status_code = response.status_code
+        except Exception:
+            status_code = None
+
+        if status_code in (200, 201):
+            return True
+        if status_code == 202:
+            ranges = response.json().get("nextExpectedRanges") or [f"{end}-"]
+            offset = int(ranges[0].split("-")[0])
+            failures = 0
+            continue
+
+        failures += 1
+        next_offset = _next_expected_offset(upload_url)
+        if next_offset is None or failures > UPLOAD_CHUNK_RETRIES:
+            try:
+                graph_client.delete(upload_url)
+            except Exception:
+                pass
+            return False
+        offset = next_offset
+
+    return False
+
+def upload_to_eval_benchmark(token, site_id, file_name, file_content):
+    """Uploads a file to the Eval Benchmark folder in SharePoint
+
+    Files above SIMPLE_UPLOAD_LIMIT go through a chunked, resumable upload session.
+    """
+    drive_id = get_document_drive_id(token, site_id)
     if not drive_id:
         return None
-        
-    existing_file = get_file_item(token, drive_id, file_name)
     
     upload_headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/octet-stream"
     }
     
-    if existing_file and "id" in existing_file:
-        upload_url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/items/{existing_file['id']}/content"
-        response = requests.put(upload_url, headers=upload_headers, data=file_content)
-        
-        if response.status_code in (200, 201):
-            return True
-        else:
+    for attempt in range(2):
+        folder_id = get_eval_benchmark_folder_id(token, drive_id, create=True)
+        if not folder_id:
             return False
-    else:
-        upload_url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/root:{EVAL_BENCHMARK_PATH}/{file_name}:/content"
-        
-        response = requests.put(upload_url, headers=upload_headers, data=file_content)
 
-        if response.status_code in (200, 201):
-            return True
+        if len(file_content) > SIMPLE_UPLOAD_LIMIT:
+            response = create_upload_session(token, drive_id, folder_id, file_name)
+            if response.status_code == 200:
+                return upload_in_chunks(response.json()["uploadUrl"], file_content)
         else:
-            try:
-                root_url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/root/children"
-                root_response = requests.get(root_url, headers=headers)
-                
-                if root_response.status_code == 200:
-                    root_items = root_response.json()
-                    
-                    if "value" in root_items:
-                        eval_benchmark_id = None
-                        for item in root_items["value"]:
-                            if item.get("name") == "Eval Benchmark" and "folder" in item:
-                                eval_benchmark_id = item.get("id")
-                                break
-                        
-                        if not eval_benchmark_id:
-                            create_folder_url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/root/children"
-                            create_folder_data = {
-                                "name": "Eval Benchmark",
-                                "folder": {},
-                                "@microsoft.graph.conflictBehavior": "rename"
-                            }
-                            create_folder_response = requests.post(
-                                create_folder_url, 
-                                headers={**headers, "Content-Type": "application/json"},
-                                json=create_folder_data
-                            )
-                            
-                            if create_folder_response.status_code in (200, 201):
-                                eval_benchmark_id = create_folder_response.json().get("id")
-                            else:
-                                return False
-                        
-                        if eval_benchmark_id:
-                            alt_upload_url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/items/{eval_benchmark_id}:/{file_name}:/content"
-                            alt_response = requests.put(alt_upload_url, headers=upload_headers, data=file_content)
-                            
-                            if alt_response.status_code in (200, 201):
-                                return True
-            except Exception:
-                pass
-                
+            # Creates the file or replaces an existing one with the same name
+            upload_url = f"{GRAPH_API_BASE_URL}/drives/{drive_id}/items/{folder_id}:/{quote(file_name)}:/content"
+            response = graph_client.put(upload_url, headers=upload_headers, data=file_content, timeout=GRAPH_UPLOAD_TIMEOUT)
+            if response.status_code in (200, 201):
+                return True
+
+        if response.status_code != 404 or attempt:
             return False
 
+        # Drive or folder no longer exists at the cached ID, resolve again
+        invalidate_sharepoint_location(site_id=site_id, drive_id=drive_id)
+        drive_id = get_document_drive_id(token, site_id)
+        if not drive_id:
+            return None
+
+    return False
+
 def get_all_tags_from_list(questions_list):
     """Get all unique tags from the questions list."""
     if questions_list is None or not isinstance(questions_list, list):
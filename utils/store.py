@@ -0,0 +1,312 @@
+import json
+import threading
+import time
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.s3 import (
+    get_s3_client,
+    BUCKET_NAME,
+    S3_FOLDER,
+    JSON_CACHE_TTL,
+    _error_code,
+    update_json_in_s3
+)
+from utils.index import QuestionIndex
+from utils.search import SearchIndex
+
+# The snapshot keeps the legacy file name and list format. New submissions are written
+# as one small immutable object each under the log prefix and folded into the snapshot
+# by compact_questions(), in the background once the log holds COMPACT_THRESHOLD records
+# or its oldest record is COMPACT_MAX_AGE old. Bulk imports are written as a single
+# JSON Lines segment holding the whole batch. While an app replica is running the
+# snapshot lags the log by at most those limits; readers outside the app that need
+# every question should use load_questions() or the Parquet export (utils/export.py).
+QUESTIONS_SNAPSHOT = "submitted_questions.json"
+QUESTIONS_LOG_PREFIX = f"{S3_FOLDER}questions-log/"
+COMPACT_THRESHOLD = 200  # log records before compaction is scheduled
+COMPACT_MAX_AGE = 600  # seconds the oldest log record may wait for compaction
+
+# Log records never change once written, so they are cached by key while they are listed
+_record_cache = {}
+_store_state = {"questions": None, "log_keys": [], "index": None, "search": None, "version": 0, "checked_at": 0.0}
+_snapshot_state = {"etag": None, "data": None}  # last snapshot read, revalidated by ETag on every refresh
+_store_lock = threading.Lock()
+_compact_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="compact")
+_pending_compaction = {"future": None}
+_pending_lock = threading.Lock()
+
+def _new_record_key(extension=".json"):
+    """Return a log key that sorts in submission order."""
+    return f"{QUESTIONS_LOG_PREFIX}{time.time_ns():020d}-{uuid.uuid4().hex}{extension}"
+
+def _record_id(key):
+    """Return the question (or segment) ID encoded in a log key."""
+    return key[len(QUESTIONS_LOG_PREFIX):].rsplit(".", 1)[0]
+
+def _record_time(key):
+    """Return the submission time (epoch seconds) encoded in a log key."""
+    return int(key[len(QUESTIONS_LOG_PREFIX):len(QUESTIONS_LOG_PREFIX) + 20]) / 1e9
+
+def _list_log_keys():
+    """List all log record keys in submission order."""
+    keys = []
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=BUCKET_NAME, Prefix=QUESTIONS_LOG_PREFIX):
+        for obj in page.get("Contents", []):
+            if obj["Key"].endswith((".json", ".jsonl")):
+                keys.append(obj["Key"])
+    return sorted(keys)
+
+def _read_records(key):
+    """Read the records of one log object (a record or a segment), using the immutable record cache."""
+    records = _record_cache.get(key)
+    if records is None:
+        response = get_s3_client().get_object(Bucket=BUCKET_NAME, Key=key)
+        body = response["Body"].read().decode("utf-8")
+        if key.endswith(".jsonl"):
+            records = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            records = [json.loads(body)]
+        _record_cache[key] = records
+    return records
+
+def _read_snapshot():
+    """Read the current snapshot, bypassing the JSON cache.
+
+    A conditional GET on the last ETag keeps unchanged reads cheap. Errors other
+    than a missing snapshot are raised, so callers keep their previous state
+    instead of merging an empty list.
+    """
+    request = {"Bucket": BUCKET_NAME, "Key": f"{S3_FOLDER}{QUESTIONS_SNAPSHOT}"}
+    if _snapshot_state["etag"]:
+        request["IfNoneMatch"] = _snapshot_state["etag"]
+    try:
+        response = get_s3_client().get_object(**request)
+    except Exception as e:
+        code = _error_code(e)
+        if code in ("304", "NotModified"):
+            return _snapshot_state["data"]
+        if code in ("NoSuchKey", "404"):
+            _snapshot_state.update({"etag": None, "data": []})
+            return []
+        raise
+    data = json.loads(response["Body"].read().decode("utf-8"))
+    _snapshot_state.update({"etag": response.get("ETag"), "data": data})
+    return data
+
+def _merge(snapshot, log_keys):
+    """Merge the snapshot with log records that are not yet part of it.
+
+    Returns (questions, missing) where missing counts listed records that were
+    deleted before they could be read, i.e. folded into a newer snapshot.
+    """
+    questions = list(snapshot) if isinstance(snapshot, list) else []
+    seen_ids = {q["id"] for q in questions if isinstance(q, dict) and "id" in q}
+    missing = 0
+    for key in log_keys:
+        try:
+            records = _read_records(key)
+        except Exception as e:
+            if _error_code(e) not in ("NoSuchKey", "404"):
+                raise
+            missing += 1
+            continue
+        for record in records:
+            if record.get("id") not in seen_ids:
+                questions.append(record)
+    return questions, missing
+
+def _refresh():
+    """Re-read snapshot and log tail into the shared store state.
+
+    The log is listed before the snapshot is read: a compaction that finishes in
+    between only moves records into the snapshot, so none are lost. Records that
+    vanish after the listing were compacted, and the snapshot is read once more
+    to pick them up.
+    """
+    log_keys = _list_log_keys()
+    questions, missing = _merge(_read_snapshot(), log_keys)
+    if missing:
+        questions, _ = _merge(_read_snapshot(), log_keys)
+    # Drop cached records another replica folded into the snapshot and deleted
+    listed = set(log_keys)
+    for key in [key for key in list(_record_cache) if key not in listed]:
+        _record_cache.pop(key, None)
+    if questions != _store_state["questions"]:
+        _store_state.update({
+            "questions": questions,
+            "index": QuestionIndex(questions),
+            "search": None,
+            "version": _store_state["version"] + 1
+        })
+    _store_state.update({"log_keys": log_keys, "checked_at": time.time()})
+    if _compaction_due(log_keys):
+        schedule_compaction()
+    return questions
+
+def _compaction_due(log_keys):
+    """Return True when the log is long or its oldest record has waited COMPACT_MAX_AGE."""
+    if not log_keys:
+        return False
+    return len(log_keys) >= COMPACT_THRESHOLD or time.time() - _record_time(log_keys[0]) >= COMPACT_MAX_AGE
+
+def load_questions(force=False):
+    """Return all questions (snapshot + log tail) as a new list.
+
+    The merged view is shared across sessions and re-listed at most once per
+    JSON_CACHE_TTL. Question dicts are shared and must be treated as read-only.
+    """
+    with _store_lock:
+        try:
+            if (force or _store_state["questions"] is None
+                    or time.time() - _store_state["checked_at"] >= JSON_CACHE_TTL):
+                _refresh()
+        except Exception:
+            if _store_state["questions"] is None:
+                return []
+        return list(_store_state["questions"])
+
+def get_question_index():
+    """Return the shared tag / document / agent index for the current store (read-only)."""
+    load_questions()
+    return _store_state["index"] or QuestionIndex()
+
+def search_question_ids(query, k=20):
+    """Return the IDs of the top-k questions for a full-text query, best match first.
+
+    The BM25 index is built lazily once per store version and shared by all sessions.
+    """
+    load_questions()
+    with _store_lock:
+        if _store_state["search"] is None:
+            _store_state["search"] = SearchIndex(_store_state["questions"] or [])
+        return [qid for qid, _ in _store_state["search"].search(query, k)]
+
+def search_questions(query, k=20):
+    """Return the top-k questions for a full-text query, best match first."""
+    questions = get_question_index().questions
+    return [questions[qid] for qid in search_question_ids(query, k) if qid in questions]
+
+def get_store_version():
+    """Return a counter that changes whenever the merged question list changes."""
+    load_questions()
+    return _store_state["version"]
+
+def _add_records(key, records):
+    """Add records written by this process to the shared state and schedule compaction when due."""
+    with _store_lock:
+        _record_cache[key] = records
+        if _store_state["questions"] is not None:
+            for record in records:
+                _store_state["index"].add(record, len(_store_state["questions"]))
+                if _store_state["search"] is not None:
+                    _store_state["search"].add(record, len(_store_state["questions"]))
+                _store_state["questions"].append(record)
+            _store_state["log_keys"].append(key)
+            _store_state["version"] += 1
+        due = _compaction_due(_store_state["log_keys"])
+
+    if due:
+        schedule_compaction()
+
+def append_question(entry):
+    """Append a question as a new immutable log record.
+
+    Bytes written are proportional to the entry, not to the size of the library.
+    Returns the stored entry (with its "id") or None on failure.
+    """
+    key = _new_record_key()
+    record = {**entry, "id": _record_id(key)}
+    try:
+        get_s3_client().put_object(
+            Bucket=BUCKET_NAME,
+            Key=key,
+            Body=json.dumps(record),
+            ContentType="application/json"
+        )
+    except Exception:
+        return None
+
+    _add_records(key, [record])
+    return record
+
+def append_questions(entries):
+    """Append a batch of questions as one immutable log segment (a single write).
+
+    Returns the stored entries (each with its "id") or None on failure, in which
+    case nothing was stored.
+    """
+    if not entries:
+        return []
+    key = _new_record_key(".jsonl")
+    segment_id = _record_id(key)
+    records = [{**entry, "id": f"{segment_id}-{position:06d}"} for position, entry in enumerate(entries)]
+    try:
+        get_s3_client().put_object(
+            Bucket=BUCKET_NAME,
+            Key=key,
+            Body="\n".join(json.dumps(record) for record in records) + "\n",
+            ContentType="application/x-ndjson"
+        )
+    except Exception:
+        return None
+
+    _add_records(key, records)
+    return records
+
+def schedule_compaction():
+    """Compact on the background thread; calls made while one is queued are coalesced."""
+    with _pending_lock:
+        future = _pending_compaction["future"]
+        if future is None or future.running() or future.done():
+            future = _compact_executor.submit(_compact_quietly)
+            _pending_compaction["future"] = future
+        return future
+
+def _compact_quietly():
+    try:
+        return compact_questions()
+    except Exception:
+        return 0
+
+def compact_questions():
+    """Fold all log records into the snapshot and delete the folded records.
+
+    The snapshot is rewritten with a conditional PUT, so concurrent compactions on
+    other replicas merge instead of overwriting each other. The store lock is only
+    taken for the final refresh, so readers are not blocked while S3 is rewritten.
+    """
+    log_keys = _list_log_keys()
+    if not log_keys:
+        return 0
+    records = []
+    for key in log_keys:
+        try:
+            records.extend(_read_records(key))
+        except Exception as e:
+            # Already folded and deleted by a concurrent compaction
+            if _error_code(e) not in ("NoSuchKey", "404"):
+                raise
+
+    def fold(snapshot):
+        snapshot = snapshot if isinstance(snapshot, list) else []
+        seen_ids = {q["id"] for q in snapshot if isinstance(q, dict) and "id" in q}
+        snapshot.extend(record for record in records if record.get("id") not in seen_ids)
+        return snapshot
+
+    if update_json_in_s3(QUESTIONS_SNAPSHOT, fold) is None:
+        return 0
+
+    # Records are deleted only after the snapshot containing them is written;
+    # readers dedupe by "id" so the overlap in between is harmless.
+    for start in range(0, len(log_keys), 1000):
+        batch = log_keys[start:start + 1000]
+        get_s3_client().delete_objects(
+            Bucket=BUCKET_NAME,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+        )
+    with _store_lock:
+        _refresh()
+    return len(log_keys)
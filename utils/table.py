@@ -0,0 +1,114 @@
+import threading
+
+import pandas as pd
+
+from utils.store import get_question_index, get_store_version, search_question_ids
+from utils.replica import replica_enabled, replica_question_ids, replica_values
+
+QUESTION_COLUMNS = [
+    "Question",
+    "Ideal Answer",
+    "Reference Documents",
+    "Agent Name",
+    "Tags",
+    "Created On",
+    "Submitted By"
+]
+SORT_COLUMNS = ["Created On", "Agent Name", "Submitted By", "Question"]
+
+# Display frame shared by all sessions, rebuilt only when the store version changes
+_frame_cache = {"version": None, "frame": None}
+_frame_lock = threading.Lock()
+
+def _format_documents(documents):
+    """Render reference documents as one line per document."""
+    return "\n".join([
+        f"- {doc.get('name', '')} (Pages {doc.get('pages', '')}) [{doc.get('source', 'Unknown')}]"
+        for doc in documents or []
+    ])
+
+def build_questions_frame(questions_by_id):
+    """Build the display frame for {question ID: question}, indexed by question ID."""
+    questions = list(questions_by_id.values())
+    data = {
+        "Question": [q.get("Question", "") for q in questions],
+        "Ideal Answer": [q.get("Ideal Answer", "") for q in questions],
+        "Reference Documents": [_format_documents(q.get("Reference Documents")) for q in questions],
+        "Agent Name": [q.get("Agent Name", "") for q in questions],
+        "Tags": [", ".join(q.get("Tags") or []) for q in questions],
+        "Created On": [q.get("Created On", "") for q in questions],
+        "Submitted By": [q.get("Submitted By", "Unknown") for q in questions]
+    }
+    return pd.DataFrame(data, index=pd.Index(list(questions_by_id), name="id"), columns=QUESTION_COLUMNS)
+
+def get_questions_frame():
+    """Return the shared display frame for the current store version (read-only)."""
+    version = get_store_version()
+    with _frame_lock:
+        if _frame_cache["frame"] is None or _frame_cache["version"] != version:
+            _frame_cache["frame"] = build_questions_frame(get_question_index().questions)
+            _frame_cache["version"] = version
+        return _frame_cache["frame"]
+
+def get_filter_options(field):
+    """Return the sorted values of "tags", "agents" or "submitters" for the page's pickers.
+
+    Read from the SQLite replica when one is configured, otherwise from the question index.
+    """
+    if replica_enabled():
+        return [value for value, _ in replica_values(field)]
+    return get_question_index().values(field)
+
+def text_search_ids(query, k=50):
+    """Return the IDs of the top-k questions for a text query, through the replica's FTS index when configured."""
+    if replica_enabled():
+        return replica_question_ids(text=query, limit=k)
+    return search_question_ids(query, k)
+
+def query_questions_frame(ids=None, tags=None, agents=None, submitters=None,
+                          date_from=None, date_to=None, sort_by=None, ascending=True):
+    """Filter and sort the shared frame; only the selected rows are copied.
+
+    ids restricts (and orders) the rows, e.g. to full-text search results; tag, agent
+    and submitter filters are resolved through the question index, or together with
+    the date range through the SQLite replica when one is configured. Dates are
+    compared as "%Y-%m-%d" strings, matching the stored "Created On" format.
+    """
+    frame = get_questions_frame()
+    if replica_enabled() and (tags or agents or submitters or date_from or date_to):
+        matches = replica_question_ids(tags=tags, agents=agents, submitters=submitters,
+                                       date_from=date_from, date_to=date_to)
+        tags = agents = submitters = date_from = date_to = None
+        if ids is None:
+            ids = matches
+        else:
+            matches = set(matches)
+            ids = [qid for qid in ids if qid in matches]
+
+    if tags or agents or submitters:
+        matches = get_question_index().filter(tags=tags, agents=agents, submitters=submitters)
+        if ids is None:
+            ids = matches
+        else:
+            matches = set(matches)
+            ids = [qid for qid in ids if qid in matches]
+    if ids is not None:
+        frame = frame.loc[[qid for qid in ids if qid in frame.index]]
+
+    if date_from:
+        frame = frame[frame["Created On"] >= str(date_from)]
+    if date_to:
+        frame = frame[frame["Created On"] <= str(date_to)]
+
+    if sort_by in SORT_COLUMNS:
+        frame = frame.sort_values(sort_by, ascending=ascending, kind="stable")
+    elif not ascending:
+        frame = frame.iloc[::-1]
+    return frame
+
+def page_of(frame, page, page_size):
+    """Return the rows of a 1-based page and the total number of pages."""
+    n_pages = max(1, -(-len(frame) // page_size))
+    page = min(max(1, page), n_pages)
+    start = (page - 1) * page_size
+    return frame.iloc[start:start + page_size], n_pages
@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.catalog import hash_content, record_content_hashes, record_upload
+from utils.s3 import upload_bytes
+from utils.sharepoint import upload_to_eval_benchmark
+
+UPLOAD_CONCURRENCY = 4  # files uploaded at the same time; each file sends to its backends in parallel
+
+# Workers run without a Streamlit script context, so nothing in here may call st.*.
+# Session values (token, site ID) are read by the caller and passed in.
+
+def _upload_sharepoint(token, site_id, file_name, file_bytes):
+    """Upload one file to SharePoint. Returns True on success."""
+    try:
+        result = bool(upload_to_eval_benchmark(token, site_id, file_name, file_bytes))
+    except Exception:
+        return False
+    if result:
+        record_upload(file_name, "SharePoint")
+    return result
+
+def _upload_s3(file_name, file_bytes):
+    """Upload one file to S3 straight from memory. Returns True on success."""
+    result = upload_bytes(file_bytes, file_name, verify_integrity=True)
+    if result:
+        record_upload(file_name, "S3")
+    return result
+
+def _backend_tasks(file_name, file_bytes, token, site_id):
+    """Return (backend, callable, args) for every backend a file is uploaded to."""
+    tasks = []
+    if token and site_id:
+        tasks.append(("SharePoint", _upload_sharepoint, (token, site_id, file_name, file_bytes)))
+    tasks.append(("S3", _upload_s3, (file_name, file_bytes)))
+    return tasks
+
+def _upload_one(file_name, file_bytes, token, site_id, backend_executor):
+    """Upload one file to all of its backends in parallel. Returns [(backend, success), ...].
+
+    The last backend runs in the calling worker, the others on backend_executor.
+    """
+    tasks = _backend_tasks(file_name, file_bytes, token, site_id)
+    futures = [backend_executor.submit(upload, *args) for _, upload, args in tasks[:-1]]
+
+    results = []
+    _, upload, args = tasks[-1]
+    try:
+        last_result = bool(upload(*args))
+    except Exception:
+        last_result = False
+    for (backend, _, _), future in zip(tasks, futures):
+        try:
+            results.append((backend, bool(future.result())))
+        except Exception:
+            results.append((backend, False))
+    results.append((tasks[-1][0], last_result))
+    return results
+
+def upload_files(files, token=None, site_id=None, max_concurrency=UPLOAD_CONCURRENCY,
+                 on_progress=None, content_hashes=None):
+    """Upload (file name, bytes) pairs to SharePoint and S3 concurrently.
+
+    Both backends of a file run in parallel and at most max_concurrency files are
+    in flight at once (each large S3 upload also uses its own multipart threads).
+    on_progress(done, total, file_name, results) is called from the calling
+    thread as each file finishes, so it may update the Streamlit UI.
+    Files stored on at least one backend are added to the content index, using
+    content_hashes ({file name: SHA-256}) where the caller already computed them.
+    Returns {file name: [(backend, success), ...]} in the original backend order.
+    """
+    results = {}
+    total = len(files)
+    done = 0
+    max_concurrency = max(1, max_concurrency)
+
+    # One worker per file in flight; each one hands at most one backend at a time
+    # to the backend pool, so that pool never needs more workers than files
+    with ThreadPoolExecutor(max_workers=max_concurrency) as file_executor, \
+            ThreadPoolExecutor(max_workers=max_concurrency) as backend_executor:
+        futures = {
+            file_executor.submit(_upload_one, file_name, file_bytes, token, site_id, backend_executor): file_name
+            for file_name, file_bytes in files
+        }
+        for future in as_completed(futures):
+            file_name = futures[future]
+            results[file_name] = future.result()
+            done += 1
+            if on_progress:
+                on_progress(done, total, file_name, results[file_name])
+
+    content_hashes = content_hashes or {}
+    stored = {}
+    for file_name, file_bytes in files:
+        if any(success for _, success in results[file_name]):
+            sha256 = content_hashes.get(file_name) or hash_content(file_bytes)
+            stored[sha256] = {"name": file_name, "size": len(file_bytes)}
+    record_content_hashes(stored)
+
+    return results
+
+def upload_to_backends(file_name, file_bytes, token=None, site_id=None):
+    """Upload a single file to SharePoint and S3 in parallel. Returns [(backend, success), ...]."""
+    return upload_files([(file_name, file_bytes)], token, site_id)[file_name]